@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+
+"""
+Primerjava iskalnikov poti na ponovljivih scenarijih tekme.
+
+Scenariji (določeni s semenom) postavijo jabolka na polje 3555 x 2055 mm
+na tri načine: naključno, v skupinah in ob stenah. Dodajo nasprotnika in
+pare začetek-cilj: dom -> jabolko, jabolko -> dom, koš -> koš in naključno.
+
+Za vsak iskalnik izpiše čas (povprečje in p95), število razširjenih
+stanj, dolžino poti in največjo porabo pomnilnika (tracemalloc).
+V načinu regresije rezultate primerja s shranjenimi in konča z napako,
+če je kateri iskalnik počasnejši od dovoljenega.
+
+Uporaba:
+    python3 bench_pathfinding.py --scenarios 200 --seed 0
+    python3 bench_pathfinding.py --resolution 30
+    python3 bench_pathfinding.py --save baseline.json
+    python3 bench_pathfinding.py --baseline baseline.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import tracemalloc
+from time import perf_counter
+
+import numpy as np
+
+from tmk.classes.CostMap import CostMap
+from tmk.classes.Grid import Grid
+from tmk.classes.GridSearch import astar, jps
+from tmk.classes.HierarchicalPlanner import HierarchicalPlanner
+from tmk.classes.PathCache import PathCache
+from tmk.classes.PathSmoothing import string_pull
+from tmk.classes.SpaceTimeSearch import moving_obstacle, space_time_astar
+from tmk.classes.TravelCost import travel_costs
+
+ACT_WIDTH = 3555
+ACT_HEIGHT = 2055
+# Domova (sredini košev) in hitrost robota za iskanje po prostoru in času.
+HOME = (250, ACT_HEIGHT / 2)
+ENEMY_HOME = (ACT_WIDTH - 250, ACT_HEIGHT / 2)
+ROBOT_SPEED = 300
+
+LAYOUTS = ('nakljucno', 'skupine', 'ob_steni')
+ROUTES = ('dom-jabolko', 'jabolko-dom', 'kos-kos', 'nakljucno')
+
+
+def random_apples(rnd: random.Random, layout: str, count: int):
+    """
+    Pozicije jabolk [mm] za dano razporeditev.
+    """
+    apples = []
+    if layout == 'skupine':
+        centres = [(rnd.uniform(700, ACT_WIDTH - 700), rnd.uniform(300, ACT_HEIGHT - 300))
+                   for _ in range(rnd.randint(2, 4))]
+    while len(apples) < count:
+        if layout == 'nakljucno':
+            x, y = rnd.uniform(500, ACT_WIDTH - 500), rnd.uniform(100, ACT_HEIGHT - 100)
+        elif layout == 'skupine':
+            cx, cy = rnd.choice(centres)
+            x, y = rnd.gauss(cx, 150), rnd.gauss(cy, 150)
+        else:
+            # Jabolko ob eni od štirih sten.
+            along = rnd.uniform(0, 1)
+            gap = rnd.uniform(40, 150)
+            x, y = rnd.choice(((gap, along * ACT_HEIGHT), (ACT_WIDTH - gap, along * ACT_HEIGHT),
+                               (along * ACT_WIDTH, gap), (along * ACT_WIDTH, ACT_HEIGHT - gap)))
+        if 0 < x < ACT_WIDTH and 0 < y < ACT_HEIGHT:
+            apples.append((x, y))
+    return apples
+
+
+def free_cell_near(grid, blocked, x: float, y: float):
+    """
+    Prosta celica, najbližja točki (x, y) [mm], ali None, če prostih celic ni.
+    """
+    free = np.argwhere(~blocked)
+    if not len(free):
+        return None
+    xs, ys = grid.centres()
+    distance = np.hypot(xs[free[:, 0]] - x, ys[free[:, 1]] - y)
+    return tuple(free[int(np.argmin(distance))].tolist())
+
+
+def make_scenario(rnd: random.Random, grid):
+    """
+    Ena tekma na mreži grid: jabolka, nasprotnik, mreža ovir in par začetek-cilj.
+    """
+    layout = rnd.choice(LAYOUTS)
+    route = rnd.choice(ROUTES)
+    apples = random_apples(rnd, layout, rnd.choice((5, 10, 20, 30)))
+    enemy = (rnd.uniform(500, ACT_WIDTH - 500), rnd.uniform(300, ACT_HEIGHT - 300))
+    angle = rnd.uniform(0, 2 * math.pi)
+
+    cost_map = CostMap(grid)
+    obstacles = {('apple', i): (x, y, 35) for i, (x, y) in enumerate(apples)}
+    cost_map.set_obstacles(obstacles)
+    # Za iskanje po prostoru in času je nasprotnik premikajoča se ovira.
+    static_blocked = cost_map.blocked()
+    obstacles[('robot', 0)] = enemy + (150,)
+    cost_map.set_obstacles(obstacles)
+    blocked = cost_map.blocked()
+
+    target = rnd.choice(apples)
+    start_point, goal_point = {
+        'dom-jabolko': (HOME, target),
+        'jabolko-dom': (target, HOME),
+        'kos-kos': (HOME, ENEMY_HOME),
+        'nakljucno': ((rnd.uniform(0, ACT_WIDTH), rnd.uniform(0, ACT_HEIGHT)),
+                      (rnd.uniform(0, ACT_WIDTH), rnd.uniform(0, ACT_HEIGHT))),
+    }[route]
+    return {
+        'layout': layout,
+        'route': route,
+        'apples': apples,
+        'enemy': enemy,
+        'enemy_velocity': (200 * math.cos(angle), 200 * math.sin(angle)),
+        'cost_map': cost_map,
+        'blocked': blocked,
+        'static_blocked': static_blocked,
+        'weights': cost_map.weights(),
+        'grid': grid,
+        # Celica jabolka je zasedena, zato sta začetek in cilj najbližji prosti celici.
+        'start': free_cell_near(grid, blocked, *start_point),
+        'goal': free_cell_near(grid, blocked, *goal_point),
+    }
+
+
+def cells_length(scenario, cells) -> float:
+    """
+    Dolžina poti po celicah [mm].
+    """
+    length = sum(math.hypot(x2 - x1, y2 - y1) for (x1, y1), (x2, y2) in zip(cells, cells[1:]))
+    return length * scenario['grid'].resolution
+
+
+def run_astar(scenario):
+    path, expanded = astar(scenario['blocked'], scenario['start'], scenario['goal'])
+    return path and cells_length(scenario, path), expanded, path is not None
+
+
+def run_jps(scenario):
+    path, expanded = jps(scenario['blocked'], scenario['start'], scenario['goal'])
+    return path and cells_length(scenario, path), expanded, path is not None
+
+
+def run_weighted(scenario):
+    path, expanded = astar(scenario['blocked'], scenario['start'], scenario['goal'], scenario['weights'])
+    return path and cells_length(scenario, path), expanded, path is not None
+
+
+def run_any_angle(scenario):
+    path, expanded = jps(scenario['blocked'], scenario['start'], scenario['goal'])
+    if path is None:
+        return None, expanded, False
+    return cells_length(scenario, string_pull(scenario['blocked'], path)), expanded, True
+
+
+def run_hpa_cold(scenario):
+    planner = HierarchicalPlanner(scenario['blocked'])
+    path, expanded = planner.find_path(scenario['start'], scenario['goal'])
+    return path and cells_length(scenario, path), expanded, path is not None
+
+
+def run_hpa_warm(scenario):
+    # Sektorje zgradi prvi (neštet) klic, merimo le ponovno iskanje.
+    planner = scenario.get('hpa')
+    if planner is None:
+        planner = scenario['hpa'] = HierarchicalPlanner(scenario['blocked'])
+    path, expanded = planner.find_path(scenario['start'], scenario['goal'])
+    return path and cells_length(scenario, path), expanded, path is not None
+
+
+def run_cache(scenario):
+    # Pot shrani prvi (neštet) klic, merimo le zadetek.
+    cache = scenario.get('cache')
+    if cache is None:
+        cache = scenario['cache'] = PathCache()
+    path, expanded = cache.find_path(scenario['cost_map'], scenario['start'], scenario['goal'])
+    return path and cells_length(scenario, path), expanded, path is not None
+
+
+def run_space_time(scenario):
+    grid = scenario['grid']
+    step_time = grid.resolution / ROBOT_SPEED
+    ex, ey = scenario['enemy']
+    vx, vy = scenario['enemy_velocity']
+    occupied = moving_obstacle(lambda t: (ex + vx * t, ey + vy * t), 150 + 75, int(5 / step_time), step_time, grid)
+    path, expanded = space_time_astar(scenario['static_blocked'], scenario['start'], scenario['goal'], occupied)
+    return path and cells_length(scenario, path), expanded, path is not None
+
+
+def run_travel_costs(scenario):
+    grid = scenario['grid']
+    targets = [grid.cell(x, y) for x, y in scenario['apples']]
+    costs, expanded = travel_costs(scenario['blocked'], scenario['start'], 0, targets, cell_size=grid.resolution)
+    # Uspeh, če je dosegljivo vsaj eno jabolko.
+    return None, expanded, min(costs) < math.inf
+
+
+PLANNERS = (
+    ('A*', run_astar),
+    ('JPS', run_jps),
+    ('A* z utežmi', run_weighted),
+    ('JPS+glajenje', run_any_angle),
+    ('HPA* prvič', run_hpa_cold),
+    ('HPA* ponovno', run_hpa_warm),
+    ('predpomnilnik', run_cache),
+    ('prostor-čas', run_space_time),
+    ('cene jabolk', run_travel_costs),
+)
+
+
+def measure(scenarios, repeat: int, memory_samples: int):
+    """
+    Vrne slovar iskalnik -> povzetek (čas, razširjena stanja, dolžina,
+    število scenarijev brez najdene poti, pomnilnik).
+    """
+    results = {}
+    for name, planner in PLANNERS:
+        times = []
+        expanded = []
+        lengths = []
+        no_path = 0
+        for scenario in scenarios:
+            # Prvi klic ne štejemo (pripravi shranjene sektorje in poti).
+            planner(scenario)
+            best = math.inf
+            for _ in range(repeat):
+                t = perf_counter()
+                length, count, found = planner(scenario)
+                best = min(best, perf_counter() - t)
+            times.append(best)
+            expanded.append(count)
+            if length is not None:
+                lengths.append(length)
+            if not found:
+                no_path += 1
+        # Pomnilnik merimo posebej, ker tracemalloc upočasni izvajanje.
+        peaks = []
+        for scenario in scenarios[:memory_samples]:
+            tracemalloc.start()
+            planner(scenario)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        results[name] = {
+            'time_ms': float(np.mean(times) * 1000),
+            'time_p95_ms': float(np.percentile(times, 95) * 1000),
+            'expanded': float(np.mean(expanded)),
+            'length_mm': float(np.mean(lengths)) if lengths else None,
+            'no_path': no_path,
+            'memory_kb': float(np.max(peaks) / 1024) if peaks else None,
+        }
+    return results
+
+
+def print_results(results, scenarios):
+    print('Scenarijev: %d, mreža %dx%d' % ((len(scenarios),) + scenarios[0]['blocked'].shape))
+    print('%-14s %10s %10s %12s %13s %10s %15s' % (
+        '', 'čas [ms]', 'p95 [ms]', 'razširjenih', 'dolžina [mm]', 'brez poti', 'pomnilnik [kB]'))
+    for name, _ in PLANNERS:
+        r = results[name]
+        print('%-14s %10.2f %10.2f %12.1f %13s %10d %15s' % (
+            name, r['time_ms'], r['time_p95_ms'], r['expanded'],
+            '-' if r['length_mm'] is None else '%.0f' % r['length_mm'], r['no_path'],
+            '-' if r['memory_kb'] is None else '%.0f' % r['memory_kb']))
+
+
+def compare(results, baseline, tolerance: float):
+    """
+    Iskalniki, ki so počasnejši od osnove za več kot tolerance ali pa poti
+    ne najdejo v več scenarijih kot osnova.
+    """
+    slower = []
+    for name, r in results.items():
+        if name not in baseline:
+            continue
+        limit = baseline[name]['time_ms'] * (1 + tolerance)
+        if r['time_ms'] > limit:
+            slower.append('%s: %.2f ms (dovoljeno %.2f ms)' % (name, r['time_ms'], limit))
+        if r['no_path'] > baseline[name].get('no_path', r['no_path']):
+            slower.append('%s: brez poti v %d scenarijih (osnova %d)' % (name, r['no_path'], baseline[name]['no_path']))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Primerjava iskalnikov poti')
+    parser.add_argument('--scenarios', type=int, default=200, help='število scenarijev')
+    parser.add_argument('--seed', type=int, default=0, help='seme generatorja scenarijev')
+    parser.add_argument('--resolution', type=float, default=60, help='velikost celice [mm]')
+    parser.add_argument('--repeat', type=int, default=3, help='ponovitve meritve (upoštevamo najhitrejšo)')
+    parser.add_argument('--memory-samples', type=int, default=20, help='scenariji za merjenje pomnilnika')
+    parser.add_argument('--save', help='shrani rezultate kot osnovo za primerjavo (JSON)')
+    parser.add_argument('--baseline', help='primerjaj s shranjeno osnovo (JSON)')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='dovoljena upočasnitev (0.2 = 20 %%)')
+    options = parser.parse_args()
+
+    rnd = random.Random(options.seed)
+    grid = Grid(0, 0, ACT_WIDTH, ACT_HEIGHT, options.resolution)
+    scenarios = [make_scenario(rnd, grid) for _ in range(options.scenarios)]
+    scenarios = [scenario for scenario in scenarios if scenario['start'] is not None and scenario['goal'] is not None]
+    results = measure(scenarios, options.repeat, options.memory_samples)
+    print_results(results, scenarios)
+
+    if options.save:
+        with open(options.save, 'w') as f:
+            json.dump({'scenarios': options.scenarios, 'seed': options.seed, 'resolution': options.resolution,
+                       'planners': results}, f, indent=2)
+        print('Rezultati so zapisani v ' + options.save)
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+        if (baseline['scenarios'], baseline['seed'], baseline.get('resolution', 60)) \
+                != (options.scenarios, options.seed, options.resolution):
+            print('Opozorilo: osnova je bila izmerjena na drugih scenarijih.')
+        slower = compare(results, baseline['planners'], options.tolerance)
+        if slower:
+            print('Slabši od osnove:')
+            for line in slower:
+                print('    ' + line)
+            sys.exit(1)
+        print('Noben iskalnik ni slabši od osnove.')
+
+
+if __name__ == '__main__':
+    main()
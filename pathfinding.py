@@ -1,15 +1,23 @@
-from graphics import *
 from enum import Enum
 import heapq
+import sys
 from time import time
 
+import numpy as np
+
+from tmk.classes.GridImage import compose, to_image, write_png, APPLE_GOOD, APPLE_BAD, EXPLORED, PATH, START, END
+from tmk.classes.Grid import Grid
+from tmk.classes.GridSearch import find_path, octile
+from tmk.classes.PathSmoothing import string_pull
+from tmk.classes.SpaceTimeSearch import moving_obstacle, space_time_astar
+from tmk.classes.Vec2 import Vec2
+
 ACT_WIDTH = 3555
 ACT_HEIGHT = 2055
-WIN_WIDTH = 1185  # 3555 / 3  3555 / 15 = 273
-WIN_HEIGHT = 685  # 2055 / 3  2055 / 15 = 137
-NODE_WIDTH = 273
-NODE_HEIGHT = 137
-FACTOR = 60
+# Privzeta velikost celice [mm]; med izvajanjem jo spremenimo s set_resolution.
+RESOLUTION = 60
+# Stranica kvadrata, ki ga zaseda jabolko [mm].
+APPLE_SIZE = 140
 
 
 class PriorityQueue:
@@ -53,11 +61,12 @@ class Node:
     type = NodeType.UNCHECKED
 
     def __init__(self, x, y):
+        # celica v mrezi grid
         self.x = x
         self.y = y
 
     def __str__(self):
-        return str(int(self.x / 5)) + " " + str(int(self.y / 5))
+        return str(self.x) + " " + str(self.y)
 
     def __eq__(self, other):
         return other.x == self.x and other.y == self.y
@@ -73,97 +82,56 @@ class Node:
 
 
 def calc_cost(curr: Node, end: Node):
-    x = abs(end.x / 5 - curr.x / 5)
-    y = abs(end.y / 5 - curr.y / 5)
-
-    # x bigger, y smaller
-    if x < y:
-        # x smaller, y bigger
-        temp = x
-        x = y
-        y = temp
-    return y * 14 + (x - y) * 10
-
-
-def draw_map(win):
-    # for i in game[0]:
-    #     a = Point(i.x, i.y)
-    #     b = Point(i.x + WIN_WIDTH, i.y)
-    #     line = Line(a, b)
-    #     line.draw(win)
-    #
-    for i in game:
-        #     a = Point(i[0].x, i[0].y)
-        #     b = Point(i[0].x, i[0].y + WIN_HEIGHT)
-        #     line = Line(a, b)
-        #     line.draw(win)
-
-        for j in i:
-            if j.type == NodeType.GOOD_APPLE:
-                a = Point(j.x, j.y)
-                b = Point(j.x + 5, j.y + 5)
-                r = Rectangle(a, b)
-                r.setFill(color_rgb(255, 0, 255))
-                r.draw(win)
-            elif j.type == NodeType.CHECKED:
-                a = Point(j.x, j.y)
-                b = Point(j.x + 5, j.y + 5)
-                r = Rectangle(a, b)
-                r.setFill(color_rgb(255, 255, 0))
-                r.draw(win)
-            elif j.type == NodeType.START:
-                a = Point(j.x, j.y)
-                b = Point(j.x + 5, j.y + 5)
-                r = Rectangle(a, b)
-                r.setFill(color_rgb(255, 0, 0))
-                r.draw(win)
-            elif j.type == NodeType.END:
-                a = Point(j.x, j.y)
-                b = Point(j.x + 5, j.y + 5)
-                r = Rectangle(a, b)
-                r.setFill(color_rgb(0, 255, 0))
-                r.draw(win)
-            elif j.type == NodeType.PATH:
-                a = Point(j.x, j.y)
-                b = Point(j.x + 5, j.y + 5)
-                r = Rectangle(a, b)
-                r.setFill(color_rgb(0, 255, 255))
-                r.draw(win)
-            elif j.type == NodeType.CLOSED:
-                a = Point(j.x, j.y)
-                b = Point(j.x + 5, j.y + 5)
-                r = Rectangle(a, b)
-                r.setFill(color_rgb(255, 155, 55))
-                r.draw(win)
-
-
-def put_apple(pos: Point, apple_type: NodeType):
+    return octile(curr.x, curr.y, end.x, end.y)
+
+
+def draw_map(filename="pathfinding.png", scale=8):
+    """
+    Mrezo narise v sliko PNG (brez graphics.py in zaslona).
+    :param filename: ime datoteke
+    :param scale: velikost celice v slikovnih tockah
+    """
+    types = np.array([[node.type.value for node in column] for column in game])
+    colours = [(NodeType.GOOD_APPLE, APPLE_GOOD), (NodeType.BAD_APPLE, APPLE_BAD),
+               (NodeType.CHECKED, EXPLORED), (NodeType.CLOSED, (255, 155, 55)),
+               (NodeType.PATH, PATH), (NodeType.START, START), (NodeType.END, END)]
+    layers = [(types == node_type.value, colour) for node_type, colour in colours]
+    write_png(filename, to_image(compose(types.shape, layers), scale))
+
+
+def put_apple(pos: Vec2, apple_type: NodeType):
     """
     :param pos: sredisce jabolka v milimetrih
     :param apple_type: tip jabolka
     :return: pretvori enote in jabolko doda na mapo
     """
-    x = int(pos.x - 50) // FACTOR
-    y = int(pos.y - 50) // FACTOR
-    for i in range(x, x + 7):
-        for j in range(y, y + 7):
+    half = APPLE_SIZE / 2
+    x0, x1, y0, y1 = grid.window(pos.x - half, pos.y - half, pos.x + half, pos.y + half)
+    for i in range(x0, x1):
+        for j in range(y0, y1):
             game[i][j].type = apple_type
 
 
+def get_blocked():
+    """
+    :return: tabela [x][y], v kateri so zasedene celice (jabolka) True
+    """
+    return [[node.type == NodeType.GOOD_APPLE or node.type == NodeType.BAD_APPLE for node in column]
+            for column in game]
+
+
 def comparator(node: Node):
     return node.f_cost
 
 
-def pathfiding(start_point: Point, end_point: Point):
+def pathfiding(start_point: Vec2, end_point: Vec2):
     # nastavimo zacetno tocko
-    start_x = int(start_point.x) // FACTOR
-    start_y = int(start_point.y) // FACTOR
+    start_x, start_y = grid.cell(start_point.x, start_point.y)
     start_node = game[start_x][start_y]
     start_node.type = NodeType.START
 
     # nastavimo ciljno tocko
-    end_x = int(end_point.x) // FACTOR
-    end_y = int(end_point.y) // FACTOR
+    end_x, end_y = grid.cell(end_point.x, end_point.y)
     end_node = game[end_x][end_y]
     end_node.type = NodeType.END
 
@@ -188,9 +156,9 @@ def pathfiding(start_point: Point, end_point: Point):
         # print(best_node)
         # print(best_node.type)
         # print(cost)
-        for i in range(int(best_node.x / 20) - 1, int(best_node.x / 20) + 2):
-            for j in range(int(best_node.y / 20) - 1, int(best_node.y / 20) + 2):
-                if 0 <= i < NODE_WIDTH and 0 <= j < NODE_HEIGHT:
+        for i in range(best_node.x - 1, best_node.x + 2):
+            for j in range(best_node.y - 1, best_node.y + 2):
+                if 0 <= i < grid.shape[0] and 0 <= j < grid.shape[1]:
                     temp = game[i][j]
                     if temp.type == NodeType.UNCHECKED or temp.type == NodeType.END or temp.type == NodeType.CHECKED:
                         if temp.parent is None or temp.parent.g_cost > best_node.g_cost:
@@ -211,52 +179,151 @@ def pathfiding(start_point: Point, end_point: Point):
     return path
 
 
+def pathfiding_jps(start_point: Vec2, end_point: Vec2):
+    """
+    Enako kot pathfiding, le da pot poisce z Jump Point Search
+    (na obtezenih celicah z A*), ki razsiri veliko manj celic.
+    :return: celice poti od cilja proti zacetku (brez zacetne celice)
+    """
+    start = grid.cell(start_point.x, start_point.y)
+    end = grid.cell(end_point.x, end_point.y)
+    cells, expanded = find_path(get_blocked(), start, end)
+    game[start[0]][start[1]].type = NodeType.START
+    game[end[0]][end[1]].type = NodeType.END
+    if cells is None:
+        print("NO PATH")
+        return []
+
+    path = [game[x][y] for x, y in reversed(cells[1:])]
+    for node in path[1:]:
+        node.type = NodeType.PATH
+    return path
+
+
+def pathfiding_any_angle(start_point: Vec2, end_point: Vec2):
+    """
+    Poisce pot in jo zgladi z vlecenjem vrvice, da robot zavije le tam,
+    kjer mora obiti jabolko.
+    :return: tocke na poligonu [mm] od zacetka proti cilju (brez zacetne),
+    zadnja je kar end_point; prazen seznam, ce poti ni
+    """
+    start = grid.cell(start_point.x, start_point.y)
+    end = grid.cell(end_point.x, end_point.y)
+    blocked = get_blocked()
+    cells, expanded = find_path(blocked, start, end)
+    if cells is None:
+        print("NO PATH")
+        return []
+
+    corners = string_pull(blocked, cells)
+    waypoints = [Vec2(x, y) for x, y in grid.to_field(corners[1:-1])]
+    waypoints.append(end_point)
+    return waypoints
+
+
+def pathfiding_cost_map(cost_map, start_point: Vec2, end_point: Vec2, cache=None):
+    """
+    Kot pathfiding_any_angle, le da ovire vzame iz cost_map (CostMap),
+    kjer so jabolka, nasprotnik in stene razsirjeni za polmer robota,
+    celice ob ovirah pa so drazje.
+    :param cache: PathCache, ki pot vrne brez iskanja, ce je se prosta, ali None
+    :return: tocke na poligonu [mm] od zacetka proti cilju (brez zacetne)
+    """
+    start = cost_map.grid.cell(start_point.x, start_point.y)
+    end = cost_map.grid.cell(end_point.x, end_point.y)
+    blocked = cost_map.blocked()
+    if cache is None:
+        cells, expanded = find_path(blocked, start, end, cost_map.weights())
+    else:
+        cells, expanded = cache.find_path(cost_map, start, end)
+    if cells is None:
+        print("NO PATH")
+        return []
+
+    corners = string_pull(blocked, cells)
+    waypoints = [Vec2(x, y) for x, y in cost_map.grid.to_field(corners[1:-1])]
+    waypoints.append(end_point)
+    return waypoints
+
+
+def pathfiding_space_time(cost_map, start_point: Vec2, end_point: Vec2, predict, speed: float,
+                          enemy_radius: float = 150, horizon: float = 8):
+    """
+    Poisce pot, ki se izogne napovedani poti nasprotnika.
+    :param cost_map: CostMap brez nasprotnika (update z ignore=[('robot', id)])
+    :param predict: napoved nasprotnikove pozicije, npr. EnemyTracker.predict;
+    ce vrne None (nasprotnik ni viden), poisce pot s pathfiding_cost_map
+    :param speed: hitrost nasega robota [mm/s]; v eni casovni rezini prevozi eno celico
+    :param horizon: kako dalec naprej [s] upostevamo napoved
+    :return: tocke na poligonu [mm] za vsako casovno rezino (brez zacetne);
+    ponovljena tocka pomeni cakanje
+    """
+    if predict(0) is None:
+        return pathfiding_cost_map(cost_map, start_point, end_point)
+
+    step_time = cost_map.grid.resolution / speed
+    occupied = moving_obstacle(predict, enemy_radius + cost_map.robot_radius, int(horizon / step_time),
+                               step_time, cost_map.grid)
+    start = cost_map.grid.cell(start_point.x, start_point.y)
+    end = cost_map.grid.cell(end_point.x, end_point.y)
+    cells, expanded = space_time_astar(cost_map.blocked(), start, end, occupied)
+    if cells is None:
+        print("NO PATH")
+        return []
+
+    return [Vec2(x, y) for x, y in cost_map.grid.to_field(cells[1:])]
+
+
+def set_resolution(resolution: float):
+    """
+    Nastavi velikost celice [mm] in na novo ustvari prazno mrezo. Manjse
+    celice dajo boljse poti, iskanje pa je pocasnejse.
+    """
+    global grid, game
+    grid = Grid(0, 0, ACT_WIDTH, ACT_HEIGHT, resolution)
+    game = [[Node(i, j) for j in range(grid.shape[1])] for i in range(grid.shape[0])]
+
+
 def main():
-    put_apple(Point(1763, 992), NodeType.GOOD_APPLE)
-    put_apple(Point(276, 1726), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 1700), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 1800), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 1500), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 1400), NodeType.GOOD_APPLE)
-    put_apple(Point(2420, 1439), NodeType.GOOD_APPLE)
-    put_apple(Point(1560, 554), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 2000), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 1400), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 1300), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 1200), NodeType.GOOD_APPLE)
-    put_apple(Point(1572, 1342), NodeType.GOOD_APPLE)
-    put_apple(Point(2397, 863), NodeType.GOOD_APPLE)
-    put_apple(Point(2748, 1271), NodeType.GOOD_APPLE)
-    put_apple(Point(2761, 591), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 700), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 600), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 500), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 400), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 300), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 200), NodeType.GOOD_APPLE)
-    # put_apple(Point(2000, 100), NodeType.GOOD_APPLE)
+    # velikost celice lahko podamo kot argument
+    if len(sys.argv) > 1:
+        set_resolution(float(sys.argv[1]))
+    print("mreza: " + str(grid))
+    put_apple(Vec2(1763, 992), NodeType.GOOD_APPLE)
+    put_apple(Vec2(276, 1726), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 1700), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 1800), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 1500), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 1400), NodeType.GOOD_APPLE)
+    put_apple(Vec2(2420, 1439), NodeType.GOOD_APPLE)
+    put_apple(Vec2(1560, 554), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 2000), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 1400), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 1300), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 1200), NodeType.GOOD_APPLE)
+    put_apple(Vec2(1572, 1342), NodeType.GOOD_APPLE)
+    put_apple(Vec2(2397, 863), NodeType.GOOD_APPLE)
+    put_apple(Vec2(2748, 1271), NodeType.GOOD_APPLE)
+    put_apple(Vec2(2761, 591), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 700), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 600), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 500), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 400), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 300), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 200), NodeType.GOOD_APPLE)
+    # put_apple(Vec2(2000, 100), NodeType.GOOD_APPLE)
 
     start_time = time()
-    path = pathfiding(Point(3405, 277), Point(276, 1500))
+    path = pathfiding(Vec2(3405, 277), Vec2(276, 1500))
     path.reverse()
     for point in path:
         print(point)
     end_time = time()
     print((end_time - start_time) * 1000)
-    win = GraphWin("Pathfinding by Jacob", WIN_WIDTH, WIN_HEIGHT)
-    draw_map(win)
-
-    # saves the current TKinter object in postscript format
-    win.postscript(file="image.eps", colormode='color')
-
-    # Convert from eps format to gif format using PIL
-    from PIL import Image as NewImage
-    img = NewImage.open("image.eps")
-    img.save("blank.gif", "gif")
+    draw_map("pathfinding.png")
 
-    win.getMouse()  # pause for click in window
-    win.close()
 
+set_resolution(RESOLUTION)
 
-game = [[Node(i * 20, j * 20) for j in range(35)] for i in range(87)]
-main()
+if __name__ == "__main__":
+    main()
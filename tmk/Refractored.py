@@ -10,12 +10,26 @@ from ev3dev.ev3 import TouchSensor, Button, LargeMotor, MediumMotor, Sound
 import math
 from time import time, sleep
 from collections import deque
-from io import BytesIO
-import pycurl
-import ujson
+import threading
 from enum import Enum
 import sys
 
+from classes.Trajectory import Trajectory
+from classes.PurePursuit import PurePursuit
+from classes.Mpc import MPC
+from classes.TourPlanner import TourPlanner
+from classes.EnemyTracker import EnemyTracker
+from classes.Geometry import box_contains, first_hit
+from classes.Vec2 import Vec2, transpose, distance, distance_many
+from classes.AngleMath import fast_atan2, transpose_table
+from classes.GameState import GameState
+from classes.Connection import Connection
+from classes.ConnectionPolicy import ConnectionPolicy
+from classes.UdpConnection import UdpConnection
+from classes.LatencyStats import LatencyStats
+from classes.CostMap import CostMap
+from classes.TravelCost import travel_costs
+
 
 class State(Enum):
     """
@@ -165,80 +179,6 @@ class PID:
             return p + i + d
 
 
-# from tmk.classes.Point import Point
-
-
-class Point:
-    """
-    Točka na poligonu.
-    """
-
-    def __init__(self, position):
-        self.x = position[0]
-        self.y = position[1]
-
-    def __str__(self):
-        return '(' + str(self.x) + ', ' + str(self.y) + ')'
-
-
-# from tmk.classes.Connection import Connection
-
-
-class Connection:
-    """
-    Objekt za vzpostavljanje povezave s strežnikom.
-    """
-
-    def __init__(self, url_connection: str):
-        """
-        Inicializacija nove povezave.
-
-        Argumenti:
-        url_connection: pot do datoteke na strežniku (URL)
-        """
-        self._url = url_connection
-        self._buffer = BytesIO()
-        self._pycurlObj = pycurl.Curl()
-        self._pycurlObj.setopt(self._pycurlObj.URL, self._url)
-        self._pycurlObj.setopt(self._pycurlObj.CONNECTTIMEOUT, 10)
-        self._pycurlObj.setopt(self._pycurlObj.WRITEDATA, self._buffer)
-
-    def request(self, debug=False):
-        """
-        Nalaganje podatkov s strežnika.
-        """
-        # Počistimo pomnilnik za shranjevanje sporočila
-        self._buffer.seek(0, 0)
-        self._buffer.truncate()
-        # Pošljemo zahtevek na strežnik
-        self._pycurlObj.perform()
-        # Dekodiramo sporočilo
-        msg = self._buffer.getvalue().decode()
-        # Izluščimo podatke iz JSON
-        try:
-            return ujson.loads(msg)
-        except ValueError as val_err:
-            if debug:
-                print('Napaka pri razclenjevanju datoteke JSON: ' + str(val_err))
-                print('Sporocilo streznika:')
-                print(msg)
-            return -1
-
-    def test_delay(self, num_iters: int = 10):
-        """
-        Merjenje zakasnitve pri pridobivanju podatkov o tekmi s strežnika.
-        Zgolj informativno.
-        """
-        sum_time = 0
-        for i in range(num_iters):
-            start_time = time()
-            if self.request() == -1:
-                robot_die()
-            elapsed_time = time() - start_time
-            sum_time += elapsed_time
-        return sum_time / num_iters
-
-
 # -----------------------------------------------------------------------
 # INITIALIZATION FUNCTIONS and OTHERS
 
@@ -248,7 +188,7 @@ def get_angle(p1, a1, p2) -> float:
     Izračunaj kot, za katerega se mora zavrteti robot, da bo obrnjen proti točki p2.
     Robot se nahaja v točki p1 in ima smer (kot) a1.
     """
-    a = math.degrees(math.atan2(p2.y - p1.y, p2.x - p1.x))
+    a = atan2_deg(p2.y - p1.y, p2.x - p1.x)
     a_rel = a - a1
     if abs(a_rel) > 180:
         if a_rel > 0:
@@ -259,11 +199,11 @@ def get_angle(p1, a1, p2) -> float:
     return a_rel
 
 
-def get_distance(p1: Point, p2: Point) -> float:
+def get_distance(p1: Vec2, p2: Vec2) -> float:
     """
     Evklidska razdalja med dvema točkama na poligonu.
     """
-    return math.sqrt((p2.x - p1.x) ** 2 + (p2.y - p1.y) ** 2)
+    return distance(p1, p2)
 
 
 def get_distance_from_apple_to_robot(apple) -> float:
@@ -347,6 +287,33 @@ def robot_die():
     sys.exit(0)
 
 
+def check_delay(url: str, num_iters: int = 50):
+    """
+    Izmeri zakasnitev pri pridobivanju podatkov o tekmi z ločeno povezavo
+    in izpiše percentile. Zgolj informativno; teče v svoji niti.
+    """
+    probe = Connection(url, timeout=REQUEST_TIMEOUT)
+    stats = LatencyStats()
+    errors = 0
+    for i in range(num_iters):
+        start_time = time()
+        if probe.receive() < 0:
+            errors += 1
+        else:
+            stats.add(time() - start_time)
+        sleep(0.05)
+    print('Zakasnitev v komunikaciji s streznikom: ' + str(stats) + ', napak: %d' % errors)
+
+
+def safety_stop():
+    """
+    Ustavi pogonska motorja, ko podatki o tekmi postanejo prestari.
+    """
+    print('Podatki o tekmi so prestari, ustavljam motorje.')
+    motor_left.stop(stop_action='brake')
+    motor_right.stop(stop_action='brake')
+
+
 # -----------------------------------------------------------------------
 # APPLE RELATED FUNCTIONS
 
@@ -355,11 +322,16 @@ def get_closest_good_apple():
     """
     Funkcija vrne najbližje zdravo jabolko brez upoštevanja jabolka z 'closest id'
     """
+    if APPLE_RANKING == 'travel':
+        return get_cheapest_apple([apple for apple in game_state['apples']
+                                   if apple['type'] == "appleGood" and not at_home(get_apple_pos(apple))
+                                   and apple['id'] not in contested_apples])
     min_apple = None
     min_dist = float("inf")
     for apple in game_state['apples']:
-        if apple['type'] == "appleGood" and not at_home(get_apple_pos(apple)):
-            atm_dist = get_distance(get_robot_pos(), Point(apple['position'][0:2]))
+        if apple['type'] == "appleGood" and not at_home(get_apple_pos(apple)) \
+                and apple['id'] not in contested_apples:
+            atm_dist = math.hypot(apple['position'][0] - robot_pos.x, apple['position'][1] - robot_pos.y)
             if atm_dist < min_dist:
                 min_dist = atm_dist
                 min_apple = apple
@@ -370,24 +342,71 @@ def get_closest_bad_apple():
     """
     Funkcija vrne najbližje gnilo jabolko
     """
+    if APPLE_RANKING == 'travel':
+        return get_cheapest_apple([apple for apple in game_state['apples']
+                                   if apple['type'] == "appleBad" and not at_home_enemy(get_apple_pos(apple))
+                                   and apple['id'] not in contested_apples])
     min_apple = None
     min_dist = float("inf")
     for apple in game_state['apples']:
-        if apple['type'] == "appleBad" and not at_home_enemy(get_apple_pos(apple)):
-            atm_dist = get_distance(get_robot_pos(), Point(apple['position'][0:2]))
+        if apple['type'] == "appleBad" and not at_home_enemy(get_apple_pos(apple)) \
+                and apple['id'] not in contested_apples:
+            atm_dist = math.hypot(apple['position'][0] - robot_pos.x, apple['position'][1] - robot_pos.y)
             if atm_dist < min_dist:
                 min_dist = atm_dist
                 min_apple = apple
     return min_apple
 
 
+def get_cheapest_apple(apples):
+    """
+    Funkcija vrne jabolko, do katerega je vožnja najcenejša (obvoz ovir in
+    obračanje na mestu), za vsa jabolka hkrati z enim iskanjem.
+    Če nobeno ni dosegljivo, vrne najbližje po zračni razdalji.
+    """
+    if not apples:
+        return None
+    costs, _ = travel_costs(
+        cost_map.blocked(),
+        cost_map.grid.cell(robot_pos.x, robot_pos.y),
+        robot_dir,
+        [cost_map.grid.cell(apple['position'][0], apple['position'][1]) for apple in apples],
+        cell_size=cost_map.grid.resolution,
+        turn_cost=PLAN_TURN_COST,
+        weights=cost_map.weights())
+    best = min(range(len(apples)), key=lambda i: costs[i])
+    if costs[best] == math.inf:
+        best = int(distance_many(robot_pos,
+                                 [apple['position'][0] for apple in apples],
+                                 [apple['position'][1] for apple in apples]).argmin())
+    return apples[best]
+
+
+def get_tour_apples():
+    """
+    Funkcija vrne jabolka, ki jih je še treba odpeljati:
+    zdrava, ki niso doma, in gnila, ki niso pri nasprotniku.
+    Jabolk, do katerih bo prej prišel nasprotnik, ne upoštevamo.
+    """
+    apples = []
+    for apple in game_state['apples']:
+        if apple['id'] in contested_apples:
+            continue
+        if apple['type'] == "appleGood":
+            if not at_home(get_apple_pos(apple)):
+                apples.append(apple)
+        elif not at_home_enemy(get_apple_pos(apple)):
+            apples.append(apple)
+    return apples
+
+
 def apple_in_claws(apple_id):
     apple = get_apple_by_id(apple_id)
     if apple is None:
         return False
     apple_posi = get_apple_pos(apple)
     # izmerjeno 13 cm
-    new_point = point_transpose(get_robot_pos(), get_robot_dir(), 60)
+    new_point = transpose(get_robot_pos(), get_robot_dir(), 60)
     # print(str(new_point.x) + " " + str(new_point.y))
     x_low = new_point.x - 70
     x_high = new_point.x + 70
@@ -417,7 +436,7 @@ def get_apple_id(apple):
 def get_apple_pos(apple):
     apple_id = get_apple_id(apple)
     apple = get_apple_by_id(apple_id)
-    return Point(apple['position'])
+    return Vec2(apple['position'][0], apple['position'][1])
 
 
 def get_apple_type(apple):
@@ -468,75 +487,87 @@ def get_enemy_team_score():
 # FIELD GETTERS
 
 
-def get_top_left_corner() -> Point:
-    return Point(game_state['field']['topLeft'])
+def get_top_left_corner() -> Vec2:
+    corner = game_state['field']['topLeft']
+    return Vec2(corner[0], corner[1])
 
 
-def get_top_right_corner() -> Point:
-    return Point(game_state['field']['topRight'])
+def get_top_right_corner() -> Vec2:
+    corner = game_state['field']['topRight']
+    return Vec2(corner[0], corner[1])
 
 
-def get_bottom_left_corner() -> Point:
-    return Point(game_state['field']['bottomLeft'])
+def get_bottom_left_corner() -> Vec2:
+    corner = game_state['field']['bottomLeft']
+    return Vec2(corner[0], corner[1])
 
 
-def get_bottom_right_corner() -> Point:
-    return Point(game_state['field']['bottomRight'])
+def get_bottom_right_corner() -> Vec2:
+    corner = game_state['field']['bottomRight']
+    return Vec2(corner[0], corner[1])
 
 
-def get_basket_top_left_corner() -> Point:
-    return Point(get_baskets()[team_my_tag]['topLeft'])
+def get_basket_top_left_corner() -> Vec2:
+    corner = get_baskets()[team_my_tag]['topLeft']
+    return Vec2(corner[0], corner[1])
 
 
-def get_basket_top_right_corner() -> Point:
-    return Point(get_baskets()[team_my_tag]['topRight'])
+def get_basket_top_right_corner() -> Vec2:
+    corner = get_baskets()[team_my_tag]['topRight']
+    return Vec2(corner[0], corner[1])
 
 
-def get_basket_bottom_left_corner() -> Point:
-    return Point(get_baskets()[team_my_tag]['bottomLeft'])
+def get_basket_bottom_left_corner() -> Vec2:
+    corner = get_baskets()[team_my_tag]['bottomLeft']
+    return Vec2(corner[0], corner[1])
 
 
-def get_basket_bottom_right_corner() -> Point:
-    return Point(get_baskets()[team_my_tag]['bottomRight'])
+def get_basket_bottom_right_corner() -> Vec2:
+    corner = get_baskets()[team_my_tag]['bottomRight']
+    return Vec2(corner[0], corner[1])
 
 
-def get_basket_enemy_top_left_corner() -> Point:
-    return Point(get_baskets()[team_op_tag]['topLeft'])
+def get_basket_enemy_top_left_corner() -> Vec2:
+    corner = get_baskets()[team_op_tag]['topLeft']
+    return Vec2(corner[0], corner[1])
 
 
-def get_basket_enemy_top_right_corner() -> Point:
-    return Point(get_baskets()[team_op_tag]['topRight'])
+def get_basket_enemy_top_right_corner() -> Vec2:
+    corner = get_baskets()[team_op_tag]['topRight']
+    return Vec2(corner[0], corner[1])
 
 
-def get_basket_enemy_bottom_left_corner() -> Point:
-    return Point(get_baskets()[team_op_tag]['bottomLeft'])
+def get_basket_enemy_bottom_left_corner() -> Vec2:
+    corner = get_baskets()[team_op_tag]['bottomLeft']
+    return Vec2(corner[0], corner[1])
 
 
-def get_basket_enemy_bottom_right_corner() -> Point:
-    return Point(get_baskets()[team_op_tag]['bottomRight'])
+def get_basket_enemy_bottom_right_corner() -> Vec2:
+    corner = get_baskets()[team_op_tag]['bottomRight']
+    return Vec2(corner[0], corner[1])
 
 
 # ------------------------------------------------------------------------
 # ROBOT GETTERS
 
 
-def get_robot_pos() -> Point:
+def get_robot_pos() -> Vec2:
     """
     Funkcija vrne trenutno pozicijo robota
     """
     for robot_data_iter in game_state['robots']:
         if robot_data_iter['id'] == ROBOT_ID:
-            return Point(robot_data_iter['position'][0:2])
+            return Vec2(robot_data_iter['position'][0], robot_data_iter['position'][1])
     return None
 
 
-def get_enemy_robot_pos() -> Point:
+def get_enemy_robot_pos() -> Vec2:
     """
     Funkcija vrne trenutno pozicijo nasprotnika
     """
     for robot_data_iter in game_state['robots']:
         if robot_data_iter['id'] != ROBOT_ID:
-            return Point(robot_data_iter['position'][0:2])
+            return Vec2(robot_data_iter['position'][0], robot_data_iter['position'][1])
     return None
 
 
@@ -575,59 +606,34 @@ def claws_close():
     motor_grab.stop(stop_action='hold')
 
 
-def at_home(position: Point):
-    if get_basket_top_left_corner().x < position.x < get_basket_top_right_corner().x:
-        if get_basket_bottom_left_corner().y < position.y < get_basket_top_right_corner().y:
+def at_home(position: Vec2):
+    basket = get_baskets()[team_my_tag]
+    if basket['topLeft'][0] < position.x < basket['topRight'][0]:
+        if basket['bottomLeft'][1] < position.y < basket['topRight'][1]:
             return True
     return False
 
 
-def at_home_enemy(position: Point):
-    if get_basket_enemy_top_left_corner().x < position.x < get_basket_enemy_top_right_corner().x:
-        if get_basket_enemy_bottom_left_corner().y < position.y < get_basket_enemy_top_right_corner().y:
+def at_home_enemy(position: Vec2):
+    basket = get_baskets()[team_op_tag]
+    if basket['topLeft'][0] < position.x < basket['topRight'][0]:
+        if basket['bottomLeft'][1] < position.y < basket['topRight'][1]:
             return True
     return False
 
 
-def point_transpose(curr: Point, direction, length):
-    if direction < 0:
-        direction = -direction
-    else:
-        direction = 360 - direction
-
-    curr.x += (math.cos(math.radians(direction))) * length
-    curr.y -= (math.sin(math.radians(direction))) * length
-    return curr
-
-
-def decelerate_both_motors_to(curr_speed, wanted_speed):
-    while curr_speed > wanted_speed:
-        motor_right.run_forever(speed_sp=curr_speed)
-        motor_left.run_forever(speed_sp=curr_speed)
-        curr_speed -= 4
-        sleep(0.001)
-
-
 def apples_on_path(length, width):
+    """
+    Funkcija vrne jabolka v pravokotniku dolžine `length` in polovične širine
+    `width` pred robotom (pravokotnik je obrnjen v smeri robota)
+    """
     curr_pos = get_robot_pos()
-    curr_dir = get_robot_dir()
-    temp_var = Point([curr_pos.x, curr_pos.y])
-    top_left = point_transpose(temp_var, curr_dir - 90, width)
-    temp_var = Point([curr_pos.x, curr_pos.y])
-    bottom_left = point_transpose(temp_var, curr_dir + 90, width)
-    temp_var = Point([bottom_left.x, bottom_left.y])
-    bottom_right = point_transpose(temp_var, curr_dir, length)
-
-    on_path = []
-    apples = get_apples()
-    for apple in apples:
-        if get_apple_id(apple) == get_apple_id(current_apple):
-            continue
-        apple_posi = get_apple_pos(apple)
-        if top_left.x < apple_posi.x < bottom_right.x and top_left.y < apple_posi.y < bottom_right.y:
-            on_path.append(apple)
-
-    return on_path
+    apples = [apple for apple in get_apples() if get_apple_id(apple) != get_apple_id(current_apple)]
+    inside = box_contains(
+        [apple['position'][0] for apple in apples],
+        [apple['position'][1] for apple in apples],
+        curr_pos.x, curr_pos.y, get_robot_dir(), length, width)
+    return [apple for apple, hit in zip(apples, inside) if hit]
 
 
 def encoder_apple_in_claws():
@@ -636,7 +642,7 @@ def encoder_apple_in_claws():
     return False
 
 
-def is_point_on_map(point1: Point):
+def is_point_on_map(point1: Vec2):
     if 0 < point1.x < get_bottom_right_corner().x and \
             0 < point1.y < get_top_left_corner().y:
         return True
@@ -644,24 +650,19 @@ def is_point_on_map(point1: Point):
 
 
 def get_temp_home():
+    """
+    Funkcija vrne najbližjo točko v domači košari. Točke `home` ne spremeni.
+    """
     offset = 100
-    new_home = home
     if team_my_tag == "team1":
         x = get_basket_top_right_corner().x - offset
         y_top = get_basket_top_right_corner().y - offset
         y_bot = get_basket_bottom_right_corner().y + offset
 
         if robot_pos.x < x:
-            new_home.x = robot_pos.x
-        else:
-            new_home.x = x
-
-        if robot_pos.y < y_bot:
-            new_home.y = y_bot
-        elif robot_pos.y > y_top:
-            new_home.y = y_top
+            new_x = robot_pos.x
         else:
-            new_home.y = robot_pos.y
+            new_x = x
 
     else:
         x = get_basket_top_left_corner().x + offset
@@ -669,18 +670,18 @@ def get_temp_home():
         y_bot = get_basket_bottom_left_corner().y + offset
 
         if robot_pos.x > x:
-            new_home.x = robot_pos.x
+            new_x = robot_pos.x
         else:
-            new_home.x = x
+            new_x = x
 
-        if robot_pos.y < y_bot:
-            new_home.y = y_bot
-        elif robot_pos.y > y_top:
-            new_home.y = y_top
-        else:
-            new_home.y = robot_pos.y
+    if robot_pos.y < y_bot:
+        new_y = y_bot
+    elif robot_pos.y > y_top:
+        new_y = y_top
+    else:
+        new_y = robot_pos.y
 
-    return new_home
+    return Vec2(new_x, new_y)
 
 
 def bad_apples_at_home():
@@ -694,20 +695,29 @@ def bad_apples_at_home():
     return res
 
 
-def apple_on_path():
-    new_point = point_transpose(get_robot_pos(), get_robot_dir(), 200)
-    x_low = new_point.x - 75
-    x_high = new_point.x + 75
-    y_low = new_point.y - 75
-    y_high = new_point.y + 75
+def get_first_obstacle(target_point: Vec2, length):
+    """
+    Funkcija vrne prvo oviro (jabolko ali nasprotnikov robot) na poti robota
+    proti točki `target_point`, ki je od robota oddaljena manj kot `length`,
+    in razdaljo do nje. Robot na poti pometa krog s polmerom ROBOT_RADIUS.
+    Če je pot prosta, vrne (None, inf).
+    """
+    obstacles = [apple for apple in get_apples() if get_apple_id(apple) != get_apple_id(current_apple)]
+    radii = [APPLE_RADIUS] * len(obstacles)
+    for robot_data_iter in get_robots():
+        if robot_data_iter['id'] != ROBOT_ID:
+            obstacles.append(robot_data_iter)
+            radii.append(ENEMY_RADIUS)
 
-    apples = get_apples()
-    for apple in apples:
-        apple_posi = get_apple_pos(apple)
-        if x_low < apple_posi.x < x_high and y_low < apple_posi.y < y_high and get_apple_id(apple) != get_apple_id(
-                current_apple):
-            return apple
-    return None
+    direction = atan2_deg(target_point.y - robot_pos.y, target_point.x - robot_pos.x)
+    length = min(length, get_distance(robot_pos, target_point))
+    index, dist = first_hit(
+        [obstacle['position'][0] for obstacle in obstacles],
+        [obstacle['position'][1] for obstacle in obstacles],
+        radii, robot_pos.x, robot_pos.y, direction, length, ROBOT_RADIUS)
+    if index is None:
+        return None, dist
+    return obstacles[index], dist
 
 
 # ------------------------------------------------------------------------
@@ -719,6 +729,27 @@ ROBOT_ID = 35
 SERVER_IP = "192.168.0.153"
 # Datoteka na strežniku s podatki o tekmi.
 GAME_STATE_FILE = "game.json"
+# Način prenosa stanja tekme: 'http' (branje game.json) ali 'udp'
+# (datagrami, ki jih pošilja relay.py; HTTP ostane kot rezerva).
+TRANSPORT = 'http'
+# Vrata in skupina multicast (ali None) za prenos UDP.
+UDP_PORT = 9000
+UDP_GROUP = None
+# Dolgo povpraševanje pri posredniku relay.py: None za navadno branje,
+# sicer čas čakanja na novo sliko [s] (0 = takoj vrni "nespremenjeno").
+LONG_POLL_WAIT = None
+# Najdaljši čas enega zahtevka na strežnik [s].
+REQUEST_TIMEOUT = 0.2
+# Najdaljši čas osveževanja stanja z vsemi ponovnimi poskusi [s].
+POLL_DEADLINE = 0.3
+# Največje število ponovnih poskusov in osnovni razmik med njimi [s].
+POLL_RETRIES = 3
+POLL_BACKOFF = 0.02
+# Starost podatkov, pri kateri robota ustavimo [s].
+STALE_LIMIT = 0.5
+# Selektivno razčlenjevanje sporočil (GameState); vklopi le, če
+# bench_decode.py na posnetih sporočilih pokaže pohitritev.
+SELECTIVE_DECODE = False
 
 # Priklop motorjev na izhode.
 MOTOR_LEFT_PORT = 'outA'
@@ -757,11 +788,6 @@ PID_FRWD_APPLE_KP = 1.0  # 5.0
 PID_FRWD_APPLE_KI = 0.0
 PID_FRWD_APPLE_KD = 0.0
 PID_FRWD_APPLE_INT_MAX = 100
-# Zavijanje med vožnjo naravnost s jabolkom
-PID_FRWD_TURN_APPLE_KP = 15.0
-PID_FRWD_TURN_APPLE_KI = 0.0
-PID_FRWD_TURN_APPLE_KD = 0.0
-PID_FRWD_TURN_APPLE_INT_MAX = 100
 
 # Dolžina FIFO vrste za hranjenje meritev (oddaljenost in kot do cilja).
 HIST_QUEUE_LENGTH = 3
@@ -778,6 +804,78 @@ DIST_NEAR = 100
 # in ga damo v stanje obračanja na mestu.
 TIMER_NEAR_TARGET = 3
 
+# Profili hitrosti
+# Največji pospešek koles [°/s^2].
+ACCEL_MAX = 1500
+# Največji sunek (sprememba pospeška) koles [°/s^3].
+JERK_MAX = 15000
+# Hitrost vzvratne vožnje v stanju BACK_OFF in CLEAR_OUT.
+BACK_OFF_SPEED = -500
+# Hitrost vzvratne vožnje po izpustu jabolka v stanju CLEAR_OUT.
+CLEAR_OUT_SPEED = -300
+
+# Sledenje poti (pure pursuit)
+# Razdalja med kolesoma robota [mm].
+WHEEL_BASE = 120
+# Najmanjša in največja razdalja pogleda naprej [mm].
+PURSUIT_LOOKAHEAD_MIN = 150
+PURSUIT_LOOKAHEAD_MAX = 500
+# Podaljšanje pogleda naprej na enoto hitrosti [mm / (°/s)].
+PURSUIT_LOOKAHEAD_GAIN = 0.3
+# Če je cilj bolj ob strani od tega kota [stopinje], se obrnemo na mestu.
+PURSUIT_MAX_ANGLE = 60
+# Obračanje na mestu lahko končamo pri tej napaki kota [stopinje],
+# ostanek popravi sledenje poti.
+PURSUIT_TURN_EPS = 20
+
+# Ovire na poti
+# Polmer kroga, ki ga robot pometa med vožnjo [mm].
+ROBOT_RADIUS = 75
+# Polmer jabolka [mm].
+APPLE_RADIUS = 35
+# Polmer nasprotnikovega robota [mm].
+ENEMY_RADIUS = 150
+# Kako daleč pred robotom iščemo ovire [mm].
+OBSTACLE_LOOKAHEAD = 300
+
+# Prediktivni regulator (MPC) za zadnji del približevanja jabolku
+# Premer koles [mm].
+WHEEL_DIAMETER = 56
+# Oddaljenost točke med kleščami od središča robota [mm].
+CLAW_OFFSET = 60
+# Razdalja do jabolka [mm], pod katero vožnjo prevzame MPC.
+MPC_DIST = 300
+# Največja hitrost koles pri približevanju z MPC [°/s].
+MPC_SPEED_MAX = 400
+# Dovoljena napaka točke med kleščami do jabolka [mm].
+CLAW_EPS = 40
+
+# Načrtovanje vrstnega reda pobiranja jabolk
+# Ocenjena povprečna hitrost robota [mm/s].
+TOUR_SPEED = 300
+# Ocenjen čas za pobiranje in odlaganje enega jabolka [s].
+TOUR_HANDLING_TIME = 3
+
+# Izbira jabolka: 'distance' (zračna razdalja) ali 'travel' (cena vožnje
+# po mreži z obvozom ovir in obračanjem, get_cheapest_apple).
+APPLE_RANKING = 'distance'
+# Velikost celice mreže za načrtovanje [mm].
+PLAN_CELL_SIZE = 60
+# Cena obrata na mestu za 45°, izražena v milimetrih vožnje.
+PLAN_TURN_COST = 60
+
+# Kotne funkcije
+# Uporabi približek atan2 (napaka do 0.22°) in tabele za sin/cos (napaka
+# pod 0.001) namesto funkcij iz math.
+# Vklopi le, če bench_angle.py na kocki pokaže pohitritev.
+FAST_ANGLE_MATH = False
+if FAST_ANGLE_MATH:
+    atan2_deg = fast_atan2
+    transpose = transpose_table
+else:
+    def atan2_deg(y: float, x: float) -> float:
+        return math.degrees(math.atan2(y, x))
+
 # -----------------------------------------------------------------------------
 # NASTAVITVE TIPAL, MOTORJEV IN POVEZAVE S STREŽNIKOM
 # -----------------------------------------------------------------------------
@@ -802,18 +900,38 @@ encoder_open = motor_grab.position
 # Nastavimo povezavo s strežnikom.
 url = SERVER_IP + '/' + GAME_STATE_FILE
 print('Vspostavljanje povezave z naslovom ' + url + ' ... ', end='', flush=True)
-conn = Connection(url)
+conn = Connection(url, timeout=REQUEST_TIMEOUT, long_poll=LONG_POLL_WAIT)
+if TRANSPORT == 'udp':
+    conn = UdpConnection(UDP_PORT, group=UDP_GROUP, timeout=REQUEST_TIMEOUT, fallback=conn)
 print('OK!')
 
-# Izmerimo zakasnitev pri pridobivanju podatkov (povprečje num_iters meritev)
-print('Zakasnitev v komunikaciji s streznikom ... ', end='', flush=True)
-print('%.4f s' % (conn.test_delay(num_iters=10)))
+# Zakasnitev merimo v ozadju, da ne zadržujemo začetka tekme.
+# Podrobne meritve naredimo z bench_latency.py.
+threading.Thread(target=check_delay, args=(url,), daemon=True).start()
 
 # -----------------------------------------------------------------------------
 # PRIPRAVA NA TEKMO
 # -----------------------------------------------------------------------------
 # Pridobimo podatke o tekmi.
-game_state = conn.request()
+game_state = GameState(selective=SELECTIVE_DECODE)
+policy = ConnectionPolicy(
+    conn,
+    game_state,
+    deadline=POLL_DEADLINE,
+    retries=POLL_RETRIES,
+    backoff=POLL_BACKOFF,
+    stale_limit=STALE_LIMIT,
+    on_stale=safety_stop)
+if not policy.poll():
+    print('Napaka pri pridobivanju podatkov o tekmi.')
+    robot_die()
+# Mreža ovir (jabolka, nasprotnik, stene), razširjenih za polmer robota.
+cost_map = CostMap.from_field(
+    game_state['field'],
+    resolution=PLAN_CELL_SIZE,
+    robot_radius=ROBOT_RADIUS,
+    apple_radius=APPLE_RADIUS,
+    enemy_radius=ENEMY_RADIUS)
 # Ali naš robot sploh tekmuje? Če tekmuje, ali je team1 ali team2?
 team_my_tag = 'undefined'
 team_op_tag = 'undefined'
@@ -835,7 +953,6 @@ print('Robot tekmuje in ima interno oznako "' + team_my_tag + '"')
 
 # Multiplier-ji
 pid_frwd_base_multiplier = 1
-pid_frwd_base_apple_multiplier = 1
 
 # Regulator PID za obračanje na mestu.
 # setpoint=0 pomeni, da naj bo kot med robotom in ciljem (target_angle) enak 0.
@@ -883,25 +1000,35 @@ PID_frwd_base_apple = PID(
     kd=PID_FRWD_APPLE_KD,
     integral_limit=PID_FRWD_APPLE_INT_MAX)
 
-# PID za obračanje na mestu s jabolkom
-PID_frwd_turn_apple = PID(
-    setpoint=0,
-    kp=PID_FRWD_TURN_APPLE_KP,
-    ki=PID_FRWD_TURN_APPLE_KI,
-    kd=PID_FRWD_TURN_APPLE_KD,
-    integral_limit=PID_FRWD_TURN_APPLE_INT_MAX)
+# Sledenje poti pri vožnji proti cilju.
+pursuit = PurePursuit(
+    wheel_base=WHEEL_BASE,
+    lookahead_min=PURSUIT_LOOKAHEAD_MIN,
+    lookahead_max=PURSUIT_LOOKAHEAD_MAX,
+    lookahead_gain=PURSUIT_LOOKAHEAD_GAIN)
+
+# Prediktivni regulator za zadnji del približevanja jabolku.
+mpc = MPC(
+    wheel_base=WHEEL_BASE,
+    mm_per_deg=WHEEL_DIAMETER * math.pi / 360,
+    claw_offset=CLAW_OFFSET,
+    speed_max=MPC_SPEED_MAX)
+
+# Načrt pobiranja jabolk v preostalem času tekme.
+tour = TourPlanner(
+    speed=TOUR_SPEED,
+    handling_time=TOUR_HANDLING_TIME)
+
+# Sledenje nasprotniku.
+enemy_tracker = EnemyTracker()
 
 # -----------------------------------------------------------------------------
 # GLOBALNE SPREMENLJIVKE
 # -----------------------------------------------------------------------------
 # Nastavi točko za domov
-home = get_basket_top_left_corner()
-home.x += 270
-home.y -= 515
+home = get_basket_top_left_corner() + Vec2(270, -515)
 # Nastavi točko za dom nasprotnika
-enemy_home = get_basket_enemy_top_left_corner()
-enemy_home.x += 270
-enemy_home.y -= 515
+enemy_home = get_basket_enemy_top_left_corner() + Vec2(270, -515)
 # Hitrost na obeh motorjih.
 speed_right = 0
 speed_left = 0
@@ -927,6 +1054,8 @@ picked_up_apples_id = []
 current_apple = None
 # Trenutni target
 target = None
+# Id-ji jabolk, do katerih bo nasprotnik prišel pred nami
+contested_apples = set()
 # Razdalja med robotom in ciljem.
 target_dist = 0
 # Kot med robotom in ciljem.
@@ -935,8 +1064,12 @@ target_angle = 0
 file = open('pid_data' + str(robot_dir_data_id) + '.txt', 'w')
 # Če se zatakne timer
 time_timeout = 0
-# Pospešek
-get_straight_accel_factor = 0.05
+# Profil pospeševanja pri vožnji naravnost
+straight_profile = Trajectory(ACCEL_MAX, JERK_MAX)
+# Profil vzvratne vožnje (BACK_OFF, CLEAR_OUT)
+back_off_profile = Trajectory(ACCEL_MAX, JERK_MAX)
+# Ali smo v stanju CLEAR_OUT jabolko že izpustili?
+clear_out_released = False
 
 # -----------------------------------------------------------------------------
 # GLAVNA ZANKA
@@ -948,14 +1081,19 @@ do_main_loop = True
 while do_main_loop and not btn.down:
 
     time_now = time()
-    loop_time = time_now - t_old
-    t_old = time_now
 
     # Osveži stanje tekme.
-    game_state = conn.request()
-    if game_state == -1:
-        print('Napaka v paketu, ponovni poskus ...')
+    # Ob napaki uporabimo zadnje veljavno stanje, dokler ni prestaro.
+    if not policy.poll():
+        print('Ni svežih podatkov o tekmi, ponovni poskus ...')
+    elif not policy.new_frame:
+        # Enaka slika kot v prejšnjem obhodu; motorji ohranijo zadnje hitrosti.
+        pass
     else:
+        # Čas od zadnje obdelane slike; ponovljene slike ga ne skrajšajo.
+        loop_time = time_now - t_old
+        t_old = time_now
+
         game_on = game_state['gameOn']
         time_left = get_time_left()
 
@@ -967,6 +1105,13 @@ while do_main_loop and not btn.down:
         # da sistem ne zazna oznake na robotu.
         robot_alive = (robot_pos is not None) and (robot_dir is not None)
 
+        # Sledimo nasprotniku.
+        enemy_tracker.update(time_now, get_enemy_robot_pos(), get_enemy_robot_dir())
+
+        # Ovire na mreži za načrtovanje osvežimo enkrat na sliko.
+        if APPLE_RANKING == 'travel':
+            cost_map.update(game_state, ROBOT_ID)
+
         # Če tekma poteka in je oznaka robota vidna na kameri,
         # potem izračunamo novo hitrost na motorjih.
         # Sicer motorje ustavimo.
@@ -978,9 +1123,11 @@ while do_main_loop and not btn.down:
                 time_timeout = time()
                 state_changed = True
             else:
+                state_changed = False
                 if time() - time_timeout > 8:
                     state = State.BACK_OFF
-                state_changed = False
+                    time_timeout = time()
+                    state_changed = True
             state_old = state
 
             # Spremljaj zgodovino meritev kota in oddaljenosti.
@@ -990,6 +1137,9 @@ while do_main_loop and not btn.down:
             robot_dist_hist.popleft()
             robot_dist_hist.append(target_dist)
 
+            # Jabolka, po katera nima smisla iti, ker bo nasprotnik tam pred nami.
+            contested_apples = enemy_tracker.contested(get_apples(), robot_pos, robot_dir, TOUR_SPEED)
+
             if state == State.GET_APPLE:
                 # Nastavi target na najbližje jabolko
                 # print("State GET_APPLE")
@@ -998,7 +1148,13 @@ while do_main_loop and not btn.down:
                 #        state = State.CLEAR_HOME
                 #        continue
 
-                current_apple = get_closest_good_apple()
+                # Naslednje jabolko izberemo po načrtu za preostali čas tekme.
+                tour.update(get_tour_apples(), robot_pos, home, enemy_home, get_time_left())
+                current_apple = None
+                if tour.next_apple() is not None:
+                    current_apple = get_apple_by_id(tour.next_apple())
+                if current_apple is None:
+                    current_apple = get_closest_good_apple()
                 if current_apple is None:
                     state = State.GET_BAD_APPLE
                     continue
@@ -1015,7 +1171,12 @@ while do_main_loop and not btn.down:
                 # Preverimo, ali je robot na ciljni točki.
                 # Če ni, ga tja pošljemo.
                 if target_dist > DIST_EPS:
-                    state = State.GET_TURN
+                    # Če je cilj dovolj spredaj, se ne obračamo na mestu.
+                    pursuit.set_path([target])
+                    if abs(target_angle) > PURSUIT_MAX_ANGLE:
+                        state = State.GET_TURN
+                    else:
+                        state = State.GET_STRAIGHT
                     robot_near_target_old = False
                 else:
                     state = State.HOME
@@ -1041,7 +1202,12 @@ while do_main_loop and not btn.down:
                 # Preverimo, ali je robot na ciljni točki.
                 # Če ni, ga tja pošljemo.
                 if target_dist > DIST_EPS:
-                    state = State.GET_TURN
+                    # Če je cilj dovolj spredaj, se ne obračamo na mestu.
+                    pursuit.set_path([target])
+                    if abs(target_angle) > PURSUIT_MAX_ANGLE:
+                        state = State.GET_TURN
+                    else:
+                        state = State.GET_STRAIGHT
                     robot_near_target_old = False
                 else:
                     state = State.ENEMY_HOME
@@ -1062,7 +1228,12 @@ while do_main_loop and not btn.down:
                 # Preverimo, ali je robot na ciljni točki.
                 # Če ni, ga tja pošljemo.
                 if target_dist > DIST_EPS:
-                    state = State.HOME_TURN
+                    # Če je cilj dovolj spredaj, se ne obračamo na mestu.
+                    pursuit.set_path([target])
+                    if abs(target_angle) > PURSUIT_MAX_ANGLE:
+                        state = State.HOME_TURN
+                    else:
+                        state = State.HOME_STRAIGHT
                     robot_near_target_old = False
                 else:
                     state = State.GET_APPLE
@@ -1083,7 +1254,12 @@ while do_main_loop and not btn.down:
                 # Preverimo, ali je robot na ciljni točki.
                 # Če ni, ga tja pošljemo.
                 if target_dist > DIST_EPS:
-                    state = State.ENEMY_HOME_TURN
+                    # Če je cilj dovolj spredaj, se ne obračamo na mestu.
+                    pursuit.set_path([target])
+                    if abs(target_angle) > PURSUIT_MAX_ANGLE:
+                        state = State.ENEMY_HOME_TURN
+                    else:
+                        state = State.ENEMY_HOME_STRAIGHT
                     robot_near_target_old = False
                 else:
                     state = State.GET_APPLE
@@ -1102,8 +1278,8 @@ while do_main_loop and not btn.down:
 
                 # Ali smo že dosegli ciljni kot?
                 # Zadnjih nekaj obhodov zanke mora biti absolutna vrednost
-                # napake kota manjša od DIR_EPS.
-                err = [abs(a) > DIR_EPS for a in robot_dir_hist]
+                # napake kota manjša od PURSUIT_TURN_EPS.
+                err = [abs(a) > PURSUIT_TURN_EPS for a in robot_dir_hist]
 
                 if sum(err) == 0:
                     # Vse vrednosti so znotraj tolerance, zamenjamo stanje.
@@ -1120,10 +1296,17 @@ while do_main_loop and not btn.down:
                 # Vožnja robota naravnost proti ciljni točki.
                 # print("State GET_STRAIGHT")
 
+                # Ob vstopu v stanje ponastavimo regulator in začnemo pospeševati,
+                # preden morebitno čakanje ali nov cilj preskoči preostanek obhoda.
+                if state_changed:
+                    straight_profile.start(0, time_now)
+                    straight_profile.ramp_to(SPEED_BASE_MAX)
+                    PID_frwd_base.reset()
+
                 # Predikcija kje se bomo nahajali v naslednji iteraciji
                 # Če bi bili izven mape, gremo v stanje GET_TURN
                 # Preverja 5 cm pred sabo
-                if not is_point_on_map(point_transpose(robot_pos, robot_dir, 50)):
+                if not is_point_on_map(transpose(robot_pos, robot_dir, 50)):
                     speed_left = 0
                     speed_right = 0
                     state = State.GET_TURN
@@ -1137,12 +1320,28 @@ while do_main_loop and not btn.down:
                     state = State.GET_APPLE
                     continue
 
-                # Poglej če je kakšno jabolko na poti do tarče
-                obstacle = apple_on_path()
-                if obstacle is not None:
+                # Če bo nasprotnik pri jabolku pred nami, izberemo drugo.
+                if get_apple_id(current_apple) in contested_apples:
+                    speed_left = 0
+                    speed_right = 0
+                    state = State.GET_APPLE
+                    continue
+
+                # Poglej če je kakšna ovira na poti do tarče
+                obstacle, obstacle_dist = get_first_obstacle(target, OBSTACLE_LOOKAHEAD)
+                if obstacle is not None and obstacle in get_robots():
+                    # Nasprotnik nam je zaprl pot, počakamo.
+                    print("Nasprotnik je na poti")
+                    speed_left = 0
+                    speed_right = 0
+                    motor_right.run_forever(speed_sp=0)
+                    motor_left.run_forever(speed_sp=0)
+                    continue
+                elif obstacle is not None:
                     print("Jabolko je na poti")
                     current_apple = obstacle
                     target = get_apple_pos(obstacle)
+                    pursuit.set_path([target])
                     continue
 
                 target_dist = get_distance(robot_pos, target)
@@ -1151,37 +1350,16 @@ while do_main_loop and not btn.down:
                 # beleženje za izris grafa
                 # file.write(str(target_angle) + ',' + str(time_now) + '\n')
 
-                # Vmes bi radi tudi zavijali, zato uporabimo dva regulatorja.
-                if state_changed:
-                    # Ponastavi regulatorja PID.
-                    get_straight_accel = 0.05
-                    PID_frwd_base.reset()
-                    PID_frwd_turn.reset()
-                    timer_near_target = TIMER_NEAR_TARGET
-                else:
-                    if get_straight_accel < 1:
-                        get_straight_accel += get_straight_accel_factor
-
-                # Ali smo blizu cilja?
-                robot_near_target = target_dist < DIST_NEAR
-                if not robot_near_target_old and robot_near_target:
-                    # Vstopili smo v bližino cilja.
-                    # Začnimo odštevati varnostno budilko.
-                    pid_frwd_base_multiplier = 0.5
-                    timer_near_target = TIMER_NEAR_TARGET
-                if robot_near_target:
-                    timer_near_target = timer_near_target - loop_time
-                robot_near_target_old = robot_near_target
+                # Delež največje hitrosti glede na čas od začetka vožnje.
+                get_straight_accel = straight_profile.sample(time_now) / SPEED_BASE_MAX
 
                 # Ali smo že na cilju?
-                # Zadnjih nekaj obhodov zanke mora biti razdalja do cilja
-                # manjša ali enaka DIST_EPS.
-                err_eps = [d > DIST_EPS for d in robot_dist_hist]
-                if sum(err_eps) == 0:
-                    # Razdalja do cilja je znotraj tolerance, zamenjamo stanje.
+                # Točka med kleščami mora biti od jabolka oddaljena manj kot CLAW_EPS.
+                if mpc.claw_on_target(robot_pos, robot_dir, target, CLAW_EPS):
+                    # Jabolko je med kleščami, zamenjamo stanje.
                     print("Prišli smo na cilj")
                     claws_close()
-                    if not encoder_apple_in_claws:
+                    if not encoder_apple_in_claws():
                         print("Nismo pobrali jabolko - enkoder")
                         claws_open()
                         state = State.GET_APPLE
@@ -1195,22 +1373,25 @@ while do_main_loop and not btn.down:
                         print("Pobrali smo dobro jabolko")
                         state = State.HOME
 
-                elif timer_near_target < 0:
-                    # Smo morda blizu cilja, in je varnostna budilka potekla?
+                elif target_dist < MPC_DIST:
+                    # V bližini jabolka vožnjo prevzame prediktivni regulator,
+                    # ki robota v enem gibu pripelje s kleščami na jabolko.
+                    speed_left, speed_right = mpc.control(robot_pos, robot_dir, target)
+
+                elif abs(target_angle) > PURSUIT_MAX_ANGLE:
+                    # Cilj je preveč ob strani, da bi ga dosegli po loku.
                     speed_right = 0
                     speed_left = 0
                     state = State.GET_TURN
 
                 else:
-                    # multiplier v bližini cilja zmanjša PID, ker se tudi hitrost zmanjša
-                    u_turn = PID_frwd_turn.update(
-                        measurement=target_angle) * pid_frwd_base_multiplier * get_straight_accel
                     u_base = PID_frwd_base.update(measurement=target_dist) * get_straight_accel
                     # Omejimo nazivno hitrost, ki je enaka za obe kolesi,
                     # da imamo še manevrski prostor za zavijanje.
                     u_base = min(max(u_base, -SPEED_BASE_MAX), SPEED_BASE_MAX)
-                    speed_right = (-u_base - u_turn)
-                    speed_left = (-u_base + u_turn)
+                    # Zavijamo po loku skozi točko na poti (pure pursuit).
+                    curvature = pursuit.update(robot_pos, robot_dir, -u_base)
+                    speed_left, speed_right = pursuit.wheel_speeds(-u_base, curvature)
 
             elif state == State.HOME_TURN:
                 # Obračanje robota na mestu, da bo obrnjen proti cilju.
@@ -1233,8 +1414,8 @@ while do_main_loop and not btn.down:
 
                 # Ali smo že dosegli ciljni kot?
                 # Zadnjih nekaj obhodov zanke mora biti absolutna vrednost
-                # napake kota manjša od DIR_EPS.
-                err = [abs(a) > DIR_EPS for a in robot_dir_hist]
+                # napake kota manjša od PURSUIT_TURN_EPS.
+                err = [abs(a) > PURSUIT_TURN_EPS for a in robot_dir_hist]
 
                 if sum(err) == 0 or at_home(robot_pos):
                     # Vse vrednosti so znotraj tolerance, zamenjamo stanje.
@@ -1263,16 +1444,13 @@ while do_main_loop and not btn.down:
                 if state_changed:
                     # Ponastavi regulatorja PID.
                     PID_frwd_base_apple.reset()
-                    PID_frwd_turn_apple.reset()
                     timer_near_target = TIMER_NEAR_TARGET
-                    pid_frwd_base_apple_multiplier = 1
 
                 # Ali smo blizu cilja?
                 robot_near_target = target_dist < DIST_NEAR
                 if not robot_near_target_old and robot_near_target:
                     # Vstopili smo v bližino cilja.
                     # Začnimo odštevati varnostno budilko.
-                    pid_frwd_base_apple_multiplier = 0.1
                     timer_near_target = TIMER_NEAR_TARGET
                 if robot_near_target:
                     timer_near_target = timer_near_target - loop_time
@@ -1296,15 +1474,20 @@ while do_main_loop and not btn.down:
                     speed_left = 0
                     state = State.HOME_TURN
 
+                elif abs(target_angle) > PURSUIT_MAX_ANGLE:
+                    # Cilj je preveč ob strani, da bi ga dosegli po loku.
+                    speed_right = 0
+                    speed_left = 0
+                    state = State.HOME_TURN
+
                 else:
-                    # multiplier v bližini cilja zmanjša PID, ker se tudi hitrost zmanjša
-                    u_turn = PID_frwd_turn_apple.update(measurement=target_angle) * pid_frwd_base_apple_multiplier
                     u_base = PID_frwd_base_apple.update(measurement=target_dist)
                     # Omejimo nazivno hitrost, ki je enaka za obe kolesi,
                     # da imamo še manevrski prostor za zavijanje.
                     u_base = min(max(u_base, -SPEED_BASE_MAX), SPEED_BASE_MAX)
-                    speed_right = -u_base - u_turn
-                    speed_left = -u_base + u_turn
+                    # Zavijamo po loku skozi točko na poti (pure pursuit).
+                    curvature = pursuit.update(robot_pos, robot_dir, -u_base)
+                    speed_left, speed_right = pursuit.wheel_speeds(-u_base, curvature)
 
             elif state == State.ENEMY_HOME_TURN:
                 # Obračanje robota na mestu, da bo obrnjen proti cilju.
@@ -1323,8 +1506,8 @@ while do_main_loop and not btn.down:
                     continue
                 # Ali smo že dosegli ciljni kot?
                 # Zadnjih nekaj obhodov zanke mora biti absolutna vrednost
-                # napake kota manjša od DIR_EPS.
-                err = [abs(a) > DIR_EPS for a in robot_dir_hist]
+                # napake kota manjša od PURSUIT_TURN_EPS.
+                err = [abs(a) > PURSUIT_TURN_EPS for a in robot_dir_hist]
 
                 if sum(err) == 0 or at_home_enemy(robot_pos):
                     # Vse vrednosti so znotraj tolerance, zamenjamo stanje.
@@ -1347,16 +1530,13 @@ while do_main_loop and not btn.down:
                 if state_changed:
                     # Ponastavi regulatorja PID.
                     PID_frwd_base_apple.reset()
-                    PID_frwd_turn_apple.reset()
                     timer_near_target = TIMER_NEAR_TARGET
-                    pid_frwd_base_apple_multiplier = 1
 
                 # Ali smo blizu cilja?
                 robot_near_target = target_dist < DIST_NEAR
                 if not robot_near_target_old and robot_near_target:
                     # Vstopili smo v bližino cilja.
                     # Začnimo odštevati varnostno budilko.
-                    pid_frwd_base_apple_multiplier = 0.1
                     timer_near_target = TIMER_NEAR_TARGET
                 if robot_near_target:
                     timer_near_target = timer_near_target - loop_time
@@ -1380,22 +1560,34 @@ while do_main_loop and not btn.down:
                     speed_left = 0
                     state = State.ENEMY_HOME_TURN
 
+                elif abs(target_angle) > PURSUIT_MAX_ANGLE:
+                    # Cilj je preveč ob strani, da bi ga dosegli po loku.
+                    speed_right = 0
+                    speed_left = 0
+                    state = State.ENEMY_HOME_TURN
+
                 else:
-                    # multiplier v bližini cilja zmanjša PID, ker se tudi hitrost zmanjša
-                    u_turn = PID_frwd_turn_apple.update(measurement=target_angle) * pid_frwd_base_apple_multiplier
                     u_base = PID_frwd_base_apple.update(measurement=target_dist)
                     # Omejimo nazivno hitrost, ki je enaka za obe kolesi,
                     # da imamo še manevrski prostor za zavijanje.
                     u_base = min(max(u_base, -SPEED_BASE_MAX), SPEED_BASE_MAX)
-                    speed_right = -u_base - u_turn
-                    speed_left = -u_base + u_turn
+                    # Zavijamo po loku skozi točko na poti (pure pursuit).
+                    curvature = pursuit.update(robot_pos, robot_dir, -u_base)
+                    speed_left, speed_right = pursuit.wheel_speeds(-u_base, curvature)
 
             elif state == State.BACK_OFF:
                 # print("State BACK_OFF")
-                decelerate_both_motors_to(0, -500)
-                if motor_grab.position < encoder_open:
-                    claws_open()
-                state = State.GET_APPLE
+                # Vzvratna vožnja po profilu, zanka se pri tem ne ustavi.
+                if state_changed:
+                    back_off_profile.start(0, time_now)
+                    back_off_profile.ramp_to(BACK_OFF_SPEED)
+                    back_off_profile.ramp_to(0)
+                speed_right = back_off_profile.sample(time_now)
+                speed_left = speed_right
+                if back_off_profile.done(time_now):
+                    if motor_grab.position < encoder_open:
+                        claws_open()
+                    state = State.GET_APPLE
 
             elif state == State.CLEAR_HOME:
                 bad_apples = bad_apples_at_home()
@@ -1447,10 +1639,18 @@ while do_main_loop and not btn.down:
             elif state == State.CLEAR_STRAIGHT:
                 # Vožnja robota naravnost proti ciljni točki.
 
+                # Ob vstopu v stanje ponastavimo regulatorja in začnemo pospeševati.
+                if state_changed:
+                    straight_profile.start(0, time_now)
+                    straight_profile.ramp_to(SPEED_BASE_MAX)
+                    PID_frwd_base.reset()
+                    PID_frwd_turn.reset()
+                    timer_near_target = TIMER_NEAR_TARGET
+
                 # Predikcija kje se bomo nahajali v naslednji iteraciji
                 # Če bi bili izven mape, gremo v stanje GET_TURN
                 # Preverja 5 cm pred sabo
-                if not is_point_on_map(point_transpose(robot_pos, robot_dir, 50)):
+                if not is_point_on_map(transpose(robot_pos, robot_dir, 50)):
                     speed_left = 0
                     speed_right = 0
                     state = State.CLEAR_TURN
@@ -1464,16 +1664,8 @@ while do_main_loop and not btn.down:
                     state = State.CLEAR_HOME
                     continue
 
-                # Vmes bi radi tudi zavijali, zato uporabimo dva regulatorja.
-                if state_changed:
-                    # Ponastavi regulatorja PID.
-                    get_straight_accel = 0.05
-                    PID_frwd_base.reset()
-                    PID_frwd_turn.reset()
-                    timer_near_target = TIMER_NEAR_TARGET
-                else:
-                    if get_straight_accel < 1:
-                        get_straight_accel += get_straight_accel_factor
+                # Delež največje hitrosti glede na čas od začetka vožnje.
+                get_straight_accel = straight_profile.sample(time_now) / SPEED_BASE_MAX
 
                 # Ali smo blizu cilja?
                 robot_near_target = target_dist < DIST_NEAR
@@ -1494,7 +1686,7 @@ while do_main_loop and not btn.down:
                     # Razdalja do cilja je znotraj tolerance, zamenjamo stanje.
                     print("Prišli smo na cilj")
                     claws_close()
-                    if not encoder_apple_in_claws:
+                    if not encoder_apple_in_claws():
                         print("Nismo pobrali jabolko - enkoder")
                         claws_open()
                         state = State.CLEAR_HOME
@@ -1521,10 +1713,23 @@ while do_main_loop and not btn.down:
                     speed_left = (-u_base + u_turn)
 
             elif state == State.CLEAR_OUT:
-                decelerate_both_motors_to(0, -500)
-                claws_open()
-                decelerate_both_motors_to(0, -300)
-                state = State.CLEAR_HOME
+                # Najprej se umaknemo, nato izpustimo jabolko in se še enkrat umaknemo.
+                if state_changed:
+                    clear_out_released = False
+                    back_off_profile.start(0, time_now)
+                    back_off_profile.ramp_to(BACK_OFF_SPEED)
+                    back_off_profile.ramp_to(0)
+                if back_off_profile.done(time_now):
+                    if not clear_out_released:
+                        claws_open()
+                        clear_out_released = True
+                        back_off_profile.start(0, time_now)
+                        back_off_profile.ramp_to(CLEAR_OUT_SPEED)
+                        back_off_profile.ramp_to(0)
+                    else:
+                        state = State.CLEAR_HOME
+                speed_right = back_off_profile.sample(time_now)
+                speed_left = speed_right
 
             # Omejimo vrednosti za hitrosti na motorjih.
             speed_right = round(
@@ -1552,4 +1757,8 @@ while do_main_loop and not btn.down:
             motor_right.stop(stop_action='brake')
 
 # Konec programa
+print('Napake povezave: %d, napake v paketu: %d, varnostne zaustavitve: %d'
+      % (policy.network_errors, policy.parse_errors, policy.stale_events))
+print('Slike: %d, ponovljene: %d, izpuščene: %d'
+      % (policy.frames, policy.duplicates, policy.missed))
 robot_die()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+"""
+Primerjava hitrosti kotnih funkcij (classes/AngleMath.py) s funkcijami iz math.
+[Robo liga FRI 2019: Sadovnjak]
+@Copyright: TrijeMaliKlinci
+
+Rezultat je smiseln le na procesorju robota (ARM926EJ-S brez FPU),
+zato program zaženemo na kocki EV3:
+    python3 bench_angle.py
+ali na enako počasnem jedru v emulaciji (korenski sistem ev3dev, armel):
+    qemu-arm -cpu arm926 -L <ev3dev-rootfs> <ev3dev-rootfs>/usr/bin/python3 bench_angle.py
+"""
+
+import math
+import random
+import sys
+from timeit import repeat
+
+from classes.AngleMath import sin_deg, fast_atan2, wrap180, transpose_table
+from classes.Vec2 import Vec2, transpose
+
+
+def get_angle_math(p1x, p1y, a1, p2x, p2y):
+    # Dosedanja izvedba get_angle.
+    a = math.degrees(math.atan2(p2y - p1y, p2x - p1x))
+    a_rel = a - a1
+    if abs(a_rel) > 180:
+        if a_rel > 0:
+            a_rel = a_rel - 360
+        else:
+            a_rel = a_rel + 360
+    return a_rel
+
+
+def get_angle_fast(p1x, p1y, a1, p2x, p2y):
+    return wrap180(fast_atan2(p2y - p1y, p2x - p1x) - a1)
+
+
+def measure(func, args, number):
+    # Najboljši izmed petih poskusov, v mikrosekundah na klic.
+    return min(repeat(lambda: func(*args), number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    random.seed(0)
+
+    pairs = [
+        ('get_angle', get_angle_math, get_angle_fast, (100.0, 200.0, 37.5, 1700.0, -300.0)),
+        ('transpose', transpose, transpose_table, (Vec2(100.0, 200.0), 37.5, 60.0)),
+        ('sin', lambda a: math.sin(math.radians(a)), sin_deg, (37.5,)),
+        ('atan2', lambda y, x: math.degrees(math.atan2(y, x)), fast_atan2, (-300.0, 1700.0)),
+    ]
+    print('%-10s %12s %12s %8s' % ('funkcija', 'math [us]', 'hitra [us]', 'pohitritev'))
+    for name, slow, fast, args in pairs:
+        t_slow = measure(slow, args, number)
+        t_fast = measure(fast, args, number)
+        print('%-10s %12.3f %12.3f %8.2fx' % (name, t_slow, t_fast, t_slow / t_fast))
+
+    # Največje napake na naključnih vhodih.
+    err_atan = 0
+    err_sin = 0
+    for _ in range(20000):
+        y = random.uniform(-2000, 2000)
+        x = random.uniform(-4000, 4000)
+        err_atan = max(err_atan, abs(wrap180(fast_atan2(y, x) - math.degrees(math.atan2(y, x)))))
+        a = random.uniform(-720, 720)
+        err_sin = max(err_sin, abs(sin_deg(a) - math.sin(math.radians(a))))
+    print('Največja napaka atan2: %.4f stopinj' % err_atan)
+    print('Največja napaka sin: %.5f' % err_sin)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+Primerjava časa razčlenjevanja sporočila strežnika:
+celoten ujson.loads proti selektivnemu GameState.update.
+[Robo liga FRI 2019: Sadovnjak]
+@Copyright: TrijeMaliKlinci
+
+Uporaba:
+    python3 bench_decode.py                      # sintetično sporočilo
+    python3 bench_decode.py game0.json game1.json  # posneta sporočila
+    python3 bench_decode.py --record http://192.168.0.153/game.json 50
+Z --record posnamemo podano število sporočil v datoteke game<i>.json.
+"""
+
+import sys
+from time import sleep
+from timeit import repeat
+
+import ujson
+
+from classes.GameState import GameState
+from stand_in_server import synthetic_payload
+
+
+def record(url: str, count: int):
+    from io import BytesIO
+    import pycurl
+    curl = pycurl.Curl()
+    curl.setopt(curl.URL, url)
+    for i in range(count):
+        buffer = BytesIO()
+        curl.setopt(curl.WRITEDATA, buffer)
+        curl.perform()
+        with open('game' + str(i) + '.json', 'wb') as f:
+            f.write(buffer.getvalue())
+        sleep(0.1)
+
+
+def measure(func, number):
+    # Najboljši izmed petih poskusov, v mikrosekundah na klic.
+    return min(repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--record':
+        record(sys.argv[2], int(sys.argv[3]))
+        return
+
+    if len(sys.argv) > 1:
+        payloads = []
+        for name in sys.argv[1:]:
+            with open(name, 'rb') as f:
+                payloads.append(f.read())
+    else:
+        payloads = [synthetic_payload()]
+
+    number = 2000
+    game_state = GameState(selective=True)
+    game_state.load(payloads[0])
+
+    # Selektivno razčlenjeno stanje se mora ujemati s celotnim.
+    for payload in payloads:
+        game_state.update(payload)
+        expected = ujson.loads(payload)
+        for key in ('robots', 'apples', 'gameOn', 'timeLeft'):
+            assert game_state[key] == expected[key], key
+        for team in ('team1', 'team2'):
+            assert game_state[team]['score'] == expected[team]['score'], team
+
+    def full():
+        for payload in payloads:
+            ujson.loads(payload)
+
+    def selective():
+        for payload in payloads:
+            game_state.update(payload)
+
+    # Sporočila v pomnilniku za sprejem, kot ga polni Connection.receive.
+    buffers = []
+    for payload in payloads:
+        buffer = bytearray(max(16384, len(payload)))
+        buffer[:len(payload)] = payload
+        buffers.append((buffer, len(payload)))
+
+    def selective_buffer():
+        for buffer, length in buffers:
+            game_state.update(buffer, length)
+
+    t_full = measure(full, number) / len(payloads)
+    t_selective = measure(selective, number) / len(payloads)
+    t_buffer = measure(selective_buffer, number) / len(payloads)
+    print('Velikost sporočila: %d B' % len(payloads[0]))
+    print('ujson.loads:        %.1f us' % t_full)
+    print('GameState.update:   %.1f us' % t_selective)
+    print('GameState.update iz pomnilnika (bytearray): %.1f us' % t_buffer)
+    print('Pohitritev:         %.2fx' % (t_full / t_selective))
+    print('Celotnih razčlenjevanj: %d' % game_state.full_parses)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+"""
+Merjenje zakasnitve pri pridobivanju stanja tekme za različne načine prenosa.
+[Robo liga FRI 2019: Sadovnjak]
+@Copyright: TrijeMaliKlinci
+
+Za vsak način izpiše p50/p95/p99 in največjo zakasnitev po fazah
+(DNS, povezava, čakanje na strežnik, prenos, razčlenjevanje, skupaj)
+in rezultate zapiše v datoteko CSV.
+
+Uporaba (na robotu ali na računalniku):
+    python3 bench_latency.py --url 192.168.0.153/game.json --runs 500
+    python3 bench_latency.py --url 192.168.0.153/game.json --relay 192.168.0.10:8080/game.json --udp-port 9000
+"""
+
+import argparse
+from time import time, sleep
+
+from classes.Connection import Connection
+from classes.GameState import GameState
+from classes.LatencyStats import LatencyStats
+from classes.UdpConnection import UdpConnection
+
+PHASES = ('dns', 'connect', 'server', 'transfer', 'parse', 'total')
+
+
+def measure(conn, runs: int, interval: float, http: bool):
+    """
+    Izvedi runs zahtevkov in vrni slovar faza -> LatencyStats ter število napak.
+    """
+    stats = {phase: LatencyStats() for phase in PHASES}
+    game_state = GameState()
+    errors = 0
+    for i in range(runs):
+        start = time()
+        length = conn.receive()
+        received = time()
+        if length < 0 or not game_state.update(conn.buffer, length):
+            errors += 1
+            continue
+        parsed = time()
+        if http:
+            dns, connect, pretransfer, first_byte, total = conn.timings()
+            stats['dns'].add(dns)
+            stats['connect'].add(connect - dns)
+            stats['server'].add(first_byte - pretransfer)
+            stats['transfer'].add(total - first_byte)
+        else:
+            stats['transfer'].add(received - start)
+        stats['parse'].add(parsed - received)
+        stats['total'].add(parsed - start)
+        sleep(interval)
+    return stats, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merjenje zakasnitve povezave s strežnikom')
+    parser.add_argument('--url', required=True, help='URL do game.json')
+    parser.add_argument('--relay', help='URL do game.json na posredniku relay.py (dolgo povpraševanje)')
+    parser.add_argument('--udp-port', type=int, help='vrata za datagrame UDP posrednika relay.py')
+    parser.add_argument('--runs', type=int, default=200, help='število zahtevkov na način')
+    parser.add_argument('--interval', type=float, default=0.02, help='premor med zahtevki [s]')
+    parser.add_argument('--timeout', type=float, default=1.0, help='rok enega zahtevka [s]')
+    parser.add_argument('--output', default='latency.csv', help='datoteka z rezultati')
+    options = parser.parse_args()
+
+    transports = [
+        ('http keep-alive', Connection(options.url, timeout=options.timeout), True),
+        ('http nova povezava', Connection(options.url, timeout=options.timeout, keep_alive=False), True),
+    ]
+    if options.relay:
+        transports.append(('relay long-poll', Connection(options.relay, timeout=options.timeout, long_poll=0.5), True))
+    if options.udp_port:
+        transports.append(('udp', UdpConnection(options.udp_port, timeout=options.timeout), False))
+
+    with open(options.output, 'w') as f:
+        f.write('transport,phase,n,p50_ms,p95_ms,p99_ms,max_ms,errors\n')
+        for name, conn, http in transports:
+            stats, errors = measure(conn, options.runs, options.interval, http)
+            print('%s (napak: %d)' % (name, errors))
+            for phase in PHASES:
+                if not len(stats[phase]):
+                    continue
+                print('    %-9s %s' % (phase, stats[phase]))
+                s = stats[phase].summary()
+                f.write('%s,%s,%d,%.3f,%.3f,%.3f,%.3f,%d\n' % (
+                    name, phase, s['n'], s['p50'] * 1000, s['p95'] * 1000, s['p99'] * 1000,
+                    s['max'] * 1000, errors))
+    print('Rezultati so zapisani v ' + options.output)
+
+
+if __name__ == '__main__':
+    main()
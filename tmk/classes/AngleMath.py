@@ -0,0 +1,69 @@
+# tu so implementirane hitre kotne funkcije za EV3
+
+import math
+
+from .Vec2 import Vec2
+
+# Ločljivost tabel: število vnosov na stopinjo.
+TABLE_RESOLUTION = 10
+TABLE_SIZE = 360 * TABLE_RESOLUTION
+
+# Vrednosti sinusa za kote 0, 0.1, 0.2, ... 359.9 stopinj.
+SIN_TABLE = [math.sin(math.radians(i / TABLE_RESOLUTION)) for i in range(TABLE_SIZE)]
+# Kosinus je zamaknjen sinus.
+COS_TABLE = SIN_TABLE[90 * TABLE_RESOLUTION:] + SIN_TABLE[:90 * TABLE_RESOLUTION]
+
+# Koeficient aproksimacije atan(z) ~ z * (45 + ATAN_K * (1 - z)) za 0 <= z <= 1,
+# največja napaka je približno 0.22 stopinje.
+ATAN_K = 15.64
+
+
+def sin_deg(angle: float) -> float:
+    """
+    Sinus kota v stopinjah iz tabele (napaka manj kot 0.001).
+    """
+    # floor (ne int) zaokroži na najbližji vnos tudi pri negativnih kotih.
+    return SIN_TABLE[math.floor(angle * TABLE_RESOLUTION + 0.5) % TABLE_SIZE]
+
+
+def cos_deg(angle: float) -> float:
+    """
+    Kosinus kota v stopinjah iz tabele (napaka manj kot 0.001).
+    """
+    return COS_TABLE[math.floor(angle * TABLE_RESOLUTION + 0.5) % TABLE_SIZE]
+
+
+def transpose_table(point, direction: float, length: float) -> Vec2:
+    """
+    Različica Vec2.transpose s sinusom in kosinusom iz tabel.
+    """
+    return Vec2(point.x + cos_deg(direction) * length, point.y + sin_deg(direction) * length)
+
+
+def fast_atan2(y: float, x: float) -> float:
+    """
+    Približek funkcije atan2 v stopinjah na intervalu [-180, 180].
+    Največja napaka je približno 0.22 stopinje.
+    """
+    ax = abs(x)
+    ay = abs(y)
+    if ax >= ay:
+        if ax == 0:
+            return 0.0
+        z = ay / ax
+        a = z * (45 + ATAN_K * (1 - z))
+    else:
+        z = ax / ay
+        a = 90 - z * (45 + ATAN_K * (1 - z))
+    if x < 0:
+        a = 180 - a
+    if y < 0:
+        return -a
+    return a
+
+
+def wrap180(angle: float) -> float:
+    """
+    Preslikaj kot v stopinjah na interval [-180, 180).
+    """
+    return (angle + 180) % 360 - 180
@@ -1,9 +1,10 @@
 # tu je implementiran razred "Connection"
 
-from io import BytesIO
 import pycurl
 import ujson
-from time import time
+
+# Začetna velikost pomnilnika za sporočilo strežnika [B].
+RECV_BUFFER_SIZE = 16384
 
 
 class Connection:
@@ -11,31 +12,144 @@ class Connection:
     Objekt za vzpostavljanje povezave s strežnikom.
     """
 
-    def __init__(self, url: str):
+    def __init__(self, url: str, timeout: float = None, long_poll: float = None, keep_alive: bool = True):
         """
         Inicializacija nove povezave.
 
         Argumenti:
         url: pot do datoteke na strežniku (URL)
+        timeout: najdaljši čas enega zahtevka [s]; privzeto brez omejitve
+        long_poll: None za navadno branje; sicer čas [s], ko posrednik relay.py
+                   čaka na novo sliko (0 pomeni takojšen odgovor "nespremenjeno");
+                   timeout mora biti daljši od tega časa
+        keep_alive: ali povezavo ohranimo med zahtevki (False: vsakič nova povezava)
         """
         self._url = url
-        self._buffer = BytesIO()
+        self._long_poll = long_poll
+        # Zaporedna številka slike (glava X-Seq), če jo strežnik pošilja.
+        self.seq = None
+        self._header_seq = None
+        # Oznaka zagona posrednika (glava X-Generation), h kateri spada seq.
+        self.generation = None
+        self._header_generation = None
+        # Status zadnje vrstice stanja v glavi; telo shranimo le ob 200.
+        self._status = None
+        self._last_length = -1
+        # Vnaprej ustvarjen pomnilnik, v katerega pycurl neposredno piše sporočilo.
+        # Po potrebi se poveča (na mestu), nato pa ostane iste velikosti.
+        self.buffer = bytearray(RECV_BUFFER_SIZE)
+        self._length = 0
         self._pycurlObj = pycurl.Curl()
         self._pycurlObj.setopt(self._pycurlObj.URL, self._url)
         self._pycurlObj.setopt(self._pycurlObj.CONNECTTIMEOUT, 10)
-        self._pycurlObj.setopt(self._pycurlObj.WRITEDATA, self._buffer)
+        if timeout is not None:
+            self._pycurlObj.setopt(self._pycurlObj.CONNECTTIMEOUT_MS, int(timeout * 1000))
+            self._pycurlObj.setopt(self._pycurlObj.TIMEOUT_MS, int(timeout * 1000))
+        self._pycurlObj.setopt(self._pycurlObj.WRITEFUNCTION, self._write)
+        self._pycurlObj.setopt(self._pycurlObj.HEADERFUNCTION, self._header)
+        if not keep_alive:
+            self._pycurlObj.setopt(self._pycurlObj.FORBID_REUSE, 1)
+
+    def _write(self, chunk: bytes):
+        """
+        Kopiraj prejeti del sporočila v pomnilnik za že prejetim delom.
+        Telesa odgovorov z napako zavržemo, da ne prepišejo zadnjega sporočila.
+        """
+        if self._status != 200:
+            return
+        end = self._length + len(chunk)
+        self.buffer[self._length:end] = chunk
+        self._length = end
+
+    def _header(self, line: bytes):
+        """
+        Iz glave odgovora preberi status in zaporedno številko slike.
+        """
+        if line[:5] == b'HTTP/':
+            parts = line.split(None, 2)
+            self._status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+        elif line[:6].lower() == b'x-seq:':
+            self._header_seq = int(line[6:])
+        elif line[:13].lower() == b'x-generation:':
+            self._header_generation = line[13:].strip().decode()
+
+    def receive(self) -> int:
+        """
+        Nalaganje podatkov s strežnika brez dekodiranja in razčlenjevanja.
+        Sporočilo je v self.buffer[:dolžina], vrne njegovo dolžino
+        oziroma -1 ob napaki povezave, preteku časa ali odgovoru, ki ni 200.
+        Razčlenimo ga z GameState.update(conn.buffer, dolžina).
+
+        Ob odgovoru 304 (slika se ni spremenila) pomnilnik ostane nespremenjen,
+        zato vrnemo dolžino prejšnjega sporočila; self.seq ostane enak.
+        Po napaki ali novem zagonu posrednika (druga oznaka X-Generation ali
+        manjša številka X-Seq) self.seq pozabimo, zato naslednji zahtevek ne
+        pošlje after in dobi trenutno stanje.
+        """
+        if self._long_poll is not None:
+            if self.seq is None:
+                self._pycurlObj.setopt(self._pycurlObj.URL, self._url)
+            else:
+                self._pycurlObj.setopt(
+                    self._pycurlObj.URL,
+                    '%s?after=%d&wait=%g' % (self._url, self.seq, self._long_poll))
+        self._length = 0
+        self._header_seq = None
+        self._header_generation = None
+        self._status = None
+        try:
+            self._pycurlObj.perform()
+        except pycurl.error:
+            if self._length > 0:
+                # Sporočilo je prekinjeno sredi pomnilnika; prejšnjega ni več.
+                self._last_length = -1
+            self.seq = None
+            return -1
+        code = self._pycurlObj.getinfo(self._pycurlObj.RESPONSE_CODE)
+        if code == 304:
+            if self._new_stream():
+                # Naslednji zahtevek brez after vrne trenutno stanje.
+                self.seq = None
+                return -1
+            return self._last_length
+        if code != 200:
+            self.seq = None
+            return -1
+        if self._header_seq is not None:
+            self.seq = self._header_seq
+        self.generation = self._header_generation
+        self._last_length = self._length
+        return self._length
+
+    def _new_stream(self) -> bool:
+        """
+        Ali odgovor pripada drugemu zagonu posrednika kot self.seq.
+        """
+        if self._header_generation is not None and self._header_generation != self.generation:
+            return True
+        return self._header_seq is not None and self.seq is not None and self._header_seq < self.seq
+
+    def timings(self):
+        """
+        Časi zadnjega zahtevka od njegovega začetka [s]: (razreševanje imena,
+        vzpostavljena povezava, poslan zahtevek, prvi bajt odgovora, konec).
+        """
+        curl = self._pycurlObj
+        return (curl.getinfo(curl.NAMELOOKUP_TIME),
+                curl.getinfo(curl.CONNECT_TIME),
+                curl.getinfo(curl.PRETRANSFER_TIME),
+                curl.getinfo(curl.STARTTRANSFER_TIME),
+                curl.getinfo(curl.TOTAL_TIME))
 
     def request(self, debug=False):
         """
         Nalaganje podatkov s strežnika.
         """
-        # Počistimo pomnilnik za shranjevanje sporočila
-        self._buffer.seek(0, 0)
-        self._buffer.truncate()
-        # Pošljemo zahtevek na strežnik
-        self._pycurlObj.perform()
+        length = self.receive()
+        if length < 0:
+            return -1
         # Dekodiramo sporočilo
-        msg = self._buffer.getvalue().decode()
+        msg = self.buffer[:length].decode()
         # Izluščimo podatke iz JSON
         try:
             return ujson.loads(msg)
@@ -45,17 +159,3 @@ class Connection:
                 print('Sporocilo streznika:')
                 print(msg)
             return -1
-
-    def test_delay(self, robot_die, num_iters: int = 10):
-        """
-        Merjenje zakasnitve pri pridobivanju podatkov o tekmi s strežnika.
-        Zgolj informativno.
-        """
-        sum_time = 0
-        for i in range(num_iters):
-            start_time = time()
-            if self.request() == -1:
-                robot_die()
-            elapsed_time = time() - start_time
-            sum_time += elapsed_time
-        return sum_time / num_iters
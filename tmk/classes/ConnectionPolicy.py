@@ -0,0 +1,122 @@
+# tu je implementiran razred "ConnectionPolicy"
+
+import random
+import zlib
+from time import time, sleep
+
+
+class ConnectionPolicy:
+    """
+    Pravila za pridobivanje stanja tekme: rok za vsako osveževanje, omejeno
+    število ponovnih poskusov z naključnim razmikom, zadnje veljavno stanje
+    kot nadomestek in varnostna zaustavitev, ko so podatki prestari.
+
+    Prepozna tudi ponovljene slike: po zaporedni številki povezave (seq),
+    če jo ima, sicer po kontrolni vsoti sporočila. Ponovljenih slik ne
+    razčlenjujemo in ne štejemo za osvežitev podatkov.
+    """
+
+    def __init__(
+            self,
+            connection,
+            game_state,
+            deadline: float = 0.3,
+            retries: int = 3,
+            backoff: float = 0.02,
+            stale_limit: float = 0.5,
+            on_stale=None):
+        """
+        Argumenti:
+        connection: povezava z metodo receive() in pomnilnikom buffer
+        game_state: GameState, ki ga osvežujemo
+        deadline: čas, po katerem ne začnemo novega poskusa [s]; osveževanje lahko
+                  traja največ deadline + rok enega zahtevka na povezavi
+        retries: največje število ponovnih poskusov
+        backoff: osnovni razmik med poskusi [s]; podvoji se ob vsakem poskusu
+        stale_limit: starost podatkov, pri kateri pokličemo on_stale [s]
+        on_stale: funkcija brez argumentov, ki ustavi robota
+        """
+        self._connection = connection
+        self._game_state = game_state
+        self._deadline = deadline
+        self._retries = retries
+        self._backoff = backoff
+        self._stale_limit = stale_limit
+        self._on_stale = on_stale
+        self._last_good = None
+        # Ali so podatki trenutno prestari (on_stale je bil že poklican)?
+        self.stale = False
+        # Števci napak za izpis po tekmi.
+        self.network_errors = 0
+        self.parse_errors = 0
+        self.stale_events = 0
+        # Ali je zadnji poll prinesel novo sliko?
+        self.new_frame = False
+        # Števci slik: nove, ponovljene in izpuščene (le, če poznamo seq).
+        self.frames = 0
+        self.duplicates = 0
+        self.missed = 0
+        self._seq = None
+        self._generation = None
+        self._crc = None
+
+    def age(self) -> float:
+        """
+        Starost zadnjega veljavnega stanja [s]; inf, če ga še ni.
+        """
+        if self._last_good is None:
+            return float('inf')
+        return time() - self._last_good
+
+    def poll(self) -> bool:
+        """
+        Osveži stanje tekme. Vrne True, če je stanje uporabno: sveže ali
+        zadnje veljavno, ki ni starejše od stale_limit. Ko podatki postanejo
+        prestari, enkrat pokliče on_stale in vrača False do prvega uspeha.
+        Atribut new_frame pove, ali je stanje novo ali enako prejšnjemu.
+        """
+        self.new_frame = False
+        start = time()
+        for attempt in range(self._retries + 1):
+            length = self._connection.receive()
+            if length < 0:
+                self.network_errors += 1
+            else:
+                seq = getattr(self._connection, 'seq', None)
+                generation = getattr(self._connection, 'generation', None)
+                if generation != self._generation or (seq is not None and self._seq is not None and seq < self._seq):
+                    # Nov zagon posrednika: številke niso primerljive s prejšnjimi.
+                    self._seq = None
+                    self._generation = generation
+                crc = None
+                if seq is None:
+                    with memoryview(self._connection.buffer)[:length] as view:
+                        crc = zlib.crc32(view)
+                if (seq is not None and seq == self._seq) or (crc is not None and crc == self._crc):
+                    self.duplicates += 1
+                    break
+                if self._game_state.update(self._connection.buffer, length):
+                    if seq is not None and self._seq is not None and seq > self._seq + 1:
+                        self.missed += seq - self._seq - 1
+                    self._seq = seq
+                    self._crc = crc
+                    self.frames += 1
+                    self.new_frame = True
+                    self._last_good = time()
+                    self.stale = False
+                    return True
+                self.parse_errors += 1
+            remaining = self._deadline - (time() - start)
+            if attempt == self._retries or remaining <= 0:
+                break
+            # Naključen razmik, da se ponovni poskusi ne ujemajo s težavo na strežniku.
+            sleep(min(remaining, random.uniform(0, self._backoff * 2 ** attempt)))
+
+        if self.age() <= self._stale_limit:
+            return True
+        if not self.stale:
+            self.stale = True
+            self.stale_events += 1
+            if self._on_stale is not None:
+                self._on_stale()
+        return False
@@ -0,0 +1,200 @@
+# tu je implementiran razred "CostMap"
+
+import numpy as np
+from collections import deque
+
+from .Grid import Grid
+
+
+class CostMap:
+    """
+    Mreža zasedenosti poligona, razširjena za polmer robota (konfiguracijski
+    prostor). Robot je v celici varen, če je njeno središče od vseh ovir
+    (jabolka, nasprotnik, stene) oddaljeno vsaj robot_radius. V pasu širine
+    margin za tem je vstop v celico dražji (mehka meja), da poti ne drsijo
+    tik ob jabolkih.
+
+    Hranimo razdaljo od središča vsake celice do najbližje ovire, omejeno
+    na robot_radius + margin. Ovira zato vpliva le na celice v svoji okolici
+    in ob premiku enega jabolka preračunamo samo to okolico.
+    """
+
+    def __init__(
+            self,
+            grid,
+            robot_radius: float = 75,
+            apple_radius: float = 35,
+            enemy_radius: float = 150,
+            margin: float = 100,
+            margin_cost: float = 4,
+            move_threshold: float = None):
+        """
+        Argumenti:
+        grid: mreža celic nad poligonom (Grid)
+        robot_radius: polmer robota, vključno s kleščami [mm]
+        apple_radius: polmer jabolka [mm]
+        enemy_radius: polmer nasprotnikovega robota [mm]
+        margin: širina mehke meje okoli ovir [mm]
+        margin_cost: dodatna cena vstopa v celico tik ob oviri
+        move_threshold: premiki ovire, krajši od tega, ne spremenijo mreže [mm];
+                        privzeto pol celice, da tresenje kamere ne menja različice
+        """
+        self.grid = grid
+        self.robot_radius = robot_radius
+        self.apple_radius = apple_radius
+        self.enemy_radius = enemy_radius
+        if move_threshold is None:
+            move_threshold = grid.resolution / 2
+        self.move_threshold = move_threshold
+        self.margin = margin
+        self.margin_cost = margin_cost
+        self.shape = grid.shape
+        self._xs, self._ys = grid.centres()
+        self._limit = robot_radius + margin
+        # Razdalja do sten je stalna.
+        x_min, y_min, x_max, y_max = grid.bounds
+        wall_x = np.minimum(self._xs - x_min, x_max - self._xs)
+        wall_y = np.minimum(self._ys - y_min, y_max - self._ys)
+        self._walls = np.minimum(np.minimum.outer(wall_x, wall_y), self._limit)
+        self.clearance = self._walls.copy()
+        # Ovire: ključ -> (x, y, polmer).
+        self._obstacles = {}
+        # Poveča se ob vsaki spremembi; z njim lahko preverimo, ali je pot
+        # iz predpomnilnika še veljavna.
+        self.version = 0
+        # Zadnje spremembe: (različica, (x0, x1, y0, y1)) za changed_since.
+        self._history = deque(maxlen=64)
+        self._pending = None
+
+    @classmethod
+    def from_field(cls, field: dict, resolution: float = 60, **kwargs):
+        """
+        Ustvari mrežo za poligon iz game_state['field'].
+        """
+        return cls(Grid.from_field(field, resolution), **kwargs)
+
+    def _window(self, x: float, y: float, radius: float):
+        """
+        Celice, na katere lahko vpliva ovira s središčem (x, y): (x0, x1, y0, y1).
+        """
+        reach = radius + self._limit
+        return self.grid.window(x - reach, y - reach, x + reach, y + reach)
+
+    def _recompute(self, x0: int, x1: int, y0: int, y1: int):
+        """
+        Na novo izračunaj razdalje v pravokotniku celic iz vseh ovir, ki segajo vanj.
+        """
+        if x0 >= x1 or y0 >= y1:
+            return
+        block = self._walls[x0:x1, y0:y1].copy()
+        xs = self._xs[x0:x1, None]
+        ys = self._ys[None, y0:y1]
+        for x, y, radius in self._obstacles.values():
+            ox0, ox1, oy0, oy1 = self._window(x, y, radius)
+            if ox1 <= x0 or ox0 >= x1 or oy1 <= y0 or oy0 >= y1:
+                continue
+            np.minimum(block, np.hypot(xs - x, ys - y) - radius, out=block)
+        self.clearance[x0:x1, y0:y1] = block
+        self._mark_changed(x0, x1, y0, y1)
+
+    def _mark_changed(self, x0: int, x1: int, y0: int, y1: int):
+        if self._pending is None:
+            self._pending = (x0, x1, y0, y1)
+        else:
+            cx0, cx1, cy0, cy1 = self._pending
+            self._pending = (min(cx0, x0), max(cx1, x1), min(cy0, y0), max(cy1, y1))
+
+    def _commit(self):
+        self.version += 1
+        if self._pending is not None:
+            self._history.append((self.version, self._pending))
+            self._pending = None
+
+    def changed_since(self, version: int):
+        """
+        Pravokotniki celic (x0, x1, y0, y1), ki so se spremenili po različici
+        version, ali None, če sprememb ne hranimo več tako daleč nazaj.
+        """
+        if version == self.version:
+            return []
+        if not self._history or self._history[0][0] > version + 1:
+            return None
+        return [region for v, region in self._history if v > version]
+
+    def set_obstacles(self, obstacles: dict):
+        """
+        Zamenjaj vse ovire in mrežo izračunaj na novo.
+        obstacles: slovar ključ -> (x, y, polmer) [mm]
+        """
+        self._obstacles = dict(obstacles)
+        self._recompute(0, self.shape[0], 0, self.shape[1])
+        self._commit()
+
+    def move(self, key, x: float, y: float, radius: float = None):
+        """
+        Dodaj oviro ali jo premakni. Preračunamo le okolico stare in nove lege.
+        Premikov, krajših od move_threshold, ne upoštevamo.
+        radius: polmer ovire [mm]; privzeto apple_radius
+        """
+        if radius is None:
+            radius = self.apple_radius
+        old = self._obstacles.get(key)
+        if old is not None and old[2] == radius \
+                and (x - old[0]) ** 2 + (y - old[1]) ** 2 < self.move_threshold ** 2:
+            return
+        self._obstacles[key] = (x, y, radius)
+        if old is None:
+            # Nova ovira razdalje le zmanjša.
+            x0, x1, y0, y1 = self._window(x, y, radius)
+            if x0 < x1 and y0 < y1:
+                block = self.clearance[x0:x1, y0:y1]
+                np.minimum(block, np.hypot(self._xs[x0:x1, None] - x, self._ys[None, y0:y1] - y) - radius,
+                           out=block)
+                self._mark_changed(x0, x1, y0, y1)
+        else:
+            self._recompute(*self._window(*old))
+            self._recompute(*self._window(x, y, radius))
+        self._commit()
+
+    def remove(self, key):
+        """
+        Odstrani oviro (npr. pobrano jabolko).
+        """
+        old = self._obstacles.pop(key, None)
+        if old is None:
+            return
+        self._recompute(*self._window(*old))
+        self._commit()
+
+    def update(self, game_state, robot_id: int, ignore=()):
+        """
+        Posodobi ovire iz stanja tekme: jabolka in vse robote razen našega.
+        Premaknjene ovire preračunamo posamično, izginule odstranimo.
+        ignore: ključi ovir, ki jih izpustimo (npr. ('apple', id) ciljnega jabolka)
+        """
+        current = {}
+        for apple in game_state['apples']:
+            current[('apple', apple['id'])] = (apple['position'][0], apple['position'][1], self.apple_radius)
+        for robot in game_state['robots']:
+            if robot['id'] != robot_id:
+                current[('robot', robot['id'])] = (robot['position'][0], robot['position'][1], self.enemy_radius)
+        for key in ignore:
+            current.pop(key, None)
+        for key in [key for key in self._obstacles if key not in current]:
+            self.remove(key)
+        for key, (x, y, radius) in current.items():
+            self.move(key, x, y, radius)
+
+    def blocked(self):
+        """
+        Tabela [x][y], v kateri so celice, kjer se robot dotakne ovire, True.
+        """
+        return self.clearance < self.robot_radius
+
+    def weights(self):
+        """
+        Množitelji cene vstopa v celico za GridSearch.astar: 1 daleč od ovir,
+        do 1 + margin_cost ob robu zasedenih celic.
+        """
+        closeness = (self._limit - self.clearance) / self.margin
+        return 1 + self.margin_cost * np.clip(closeness, 0, 1)
@@ -0,0 +1,135 @@
+# tu je implementiran razred "EnemyTracker"
+
+import math
+from collections import deque
+
+
+class EnemyTracker:
+    """
+    Sledenje nasprotnikovemu robotu.
+
+    Hrani kratko zgodovino nasprotnikovih poz, iz nje oceni hitrost,
+    napove jabolko, proti kateremu se pelje, in za vsako jabolko oceni,
+    ali bo nasprotnik tam pred nami. Vse operacije so preproste,
+    zato jih lahko kličemo v vsakem obhodu zanke.
+    """
+
+    def __init__(
+            self,
+            history_length: int = 5,
+            heading_cone: float = 30,
+            min_speed: float = 100,
+            turn_rate: float = 180,
+            near_dist: float = 200):
+        """
+        Argumenti:
+        history_length: število zadnjih poz, ki jih hranimo
+        heading_cone: polovični kot stožca pred nasprotnikom [stopinje],
+            v katerem iščemo njegov cilj
+        min_speed: najmanjša hitrost nasprotnika [mm/s], s katero računamo čas prihoda
+        turn_rate: ocenjena hitrost obračanja robotov [stopinje/s]
+        near_dist: jabolka, ki so nasprotniku bližje od tega [mm], so vedno zasedena
+        """
+        self._history = deque(maxlen=history_length)
+        self._heading_cone = heading_cone
+        self._min_speed = min_speed
+        self._turn_rate = turn_rate
+        self._near_dist = near_dist
+
+    def update(self, t: float, pos, direction: float):
+        """
+        Dodaj novo meritev nasprotnikove pozicije. Če nasprotnik ni viden
+        (pos je None), zgodovino zavržemo.
+        """
+        if pos is None:
+            self._history.clear()
+            return
+        self._history.append((t, pos.x, pos.y, direction))
+
+    def visible(self) -> bool:
+        return len(self._history) > 0
+
+    def velocity(self):
+        """
+        Ocena hitrosti (vx, vy) [mm/s] iz najstarejše in najnovejše meritve.
+        """
+        if len(self._history) < 2:
+            return 0, 0
+        t0, x0, y0, _ = self._history[0]
+        t1, x1, y1, _ = self._history[-1]
+        dt = t1 - t0
+        if dt <= 0:
+            return 0, 0
+        return (x1 - x0) / dt, (y1 - y0) / dt
+
+    def predict(self, t_ahead: float):
+        """
+        Napoved nasprotnikove pozicije (x, y) čez t_ahead sekund
+        ob predpostavki konstantne hitrosti. Če nasprotnika nimamo
+        v zgodovini, vrne None.
+        """
+        if not self._history:
+            return None
+        _, x, y, _ = self._history[-1]
+        vx, vy = self.velocity()
+        return x + vx * t_ahead, y + vy * t_ahead
+
+    def arrival_time(self, x: float, y: float) -> float:
+        """
+        Ocena časa [s], v katerem nasprotnik pride do točke (x, y).
+        """
+        if not self._history:
+            return math.inf
+        _, ex, ey, direction = self._history[-1]
+        vx, vy = self.velocity()
+        speed = max(math.hypot(vx, vy), self._min_speed)
+        return math.hypot(x - ex, y - ey) / speed + \
+            abs(self._bearing_error(ex, ey, direction, x, y)) / self._turn_rate
+
+    def intended_target(self, apples):
+        """
+        Vrni id najbližjega jabolka v stožcu pred nasprotnikom (ali None).
+        """
+        if not self._history:
+            return None
+        _, ex, ey, direction = self._history[-1]
+        best_id = None
+        best_dist = math.inf
+        for apple in apples:
+            x = apple['position'][0]
+            y = apple['position'][1]
+            if abs(self._bearing_error(ex, ey, direction, x, y)) > self._heading_cone:
+                continue
+            dist = math.hypot(x - ex, y - ey)
+            if dist < best_dist:
+                best_dist = dist
+                best_id = apple['id']
+        return best_id
+
+    def contested(self, apples, our_pos, our_direction: float, our_speed: float):
+        """
+        Vrni množico id-jev jabolk, do katerih bo nasprotnik prišel pred nami.
+        Upoštevamo le jabolko, proti kateremu se nasprotnik pelje,
+        in jabolka v njegovi neposredni bližini.
+        """
+        result = set()
+        if not self._history:
+            return result
+        _, ex, ey, _ = self._history[-1]
+        target_id = self.intended_target(apples)
+        for apple in apples:
+            x = apple['position'][0]
+            y = apple['position'][1]
+            if math.hypot(x - ex, y - ey) < self._near_dist:
+                result.add(apple['id'])
+            elif apple['id'] == target_id:
+                our_time = math.hypot(x - our_pos.x, y - our_pos.y) / our_speed + \
+                    abs(self._bearing_error(our_pos.x, our_pos.y, our_direction, x, y)) / self._turn_rate
+                if self.arrival_time(x, y) < our_time:
+                    result.add(apple['id'])
+        return result
+
+    @staticmethod
+    def _bearing_error(x: float, y: float, direction: float, tx: float, ty: float) -> float:
+        a = math.degrees(math.atan2(ty - y, tx - x)) - direction
+        return (a + 180) % 360 - 180
@@ -0,0 +1,66 @@
+# tu je implementiran razred "FrameStream"
+
+import os
+import shutil
+import subprocess
+
+from .GridImage import write_png
+
+
+class FrameStream:
+    """
+    Zapis zaporedja slik (npr. posnetek tekme iz zapisanih stanj). Če je na
+    voljo ffmpeg, slike pošiljamo neposredno v video datoteko, sicer jih
+    zapišemo kot oštevilčene datoteke PNG v mapo z imenom datoteke.
+    """
+
+    def __init__(self, filename: str, fps: float = 10):
+        """
+        Argumenti:
+        filename: ime video datoteke (npr. 'tekma.mp4')
+        fps: število slik na sekundo
+        """
+        self._filename = filename
+        self._fps = fps
+        self._process = None
+        self._ffmpeg = shutil.which('ffmpeg')
+        self._shape = None
+        self.frames = 0
+
+    def write(self, image):
+        """
+        Dodaj sliko (vrstice, stolpci, 3) uint8. Vse slike morajo biti enako velike.
+        """
+        if self._shape is None:
+            self._shape = image.shape
+            self._open()
+        elif image.shape != self._shape:
+            raise ValueError('Vse slike morajo biti enako velike')
+        if self._process is not None:
+            self._process.stdin.write(image.tobytes())
+        else:
+            write_png(os.path.join(self._filename, 'frame%05d.png' % self.frames), image)
+        self.frames += 1
+
+    def _open(self):
+        height, width = self._shape[:2]
+        if self._ffmpeg is None:
+            os.makedirs(self._filename, exist_ok=True)
+            return
+        self._process = subprocess.Popen(
+            [self._ffmpeg, '-y', '-loglevel', 'error',
+             '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', '%dx%d' % (width, height), '-r', str(self._fps),
+             '-i', '-', '-pix_fmt', 'yuv420p', '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', self._filename],
+            stdin=subprocess.PIPE)
+
+    def close(self):
+        if self._process is not None:
+            self._process.stdin.close()
+            self._process.wait()
+            self._process = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
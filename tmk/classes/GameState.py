@@ -0,0 +1,153 @@
+# tu je implementiran razred "GameState"
+
+import re
+import ujson
+
+# Konec tabele ploskih objektov (brez gnezdenih objektov): "}]".
+_OBJECTS_END_RE = re.compile(rb'\}\s*\]')
+_GAME_ON_RE = re.compile(rb'"gameOn"\s*:\s*(true|false)')
+_TIME_LEFT_RE = re.compile(rb'"timeLeft"\s*:\s*(-?[0-9.eE+-]+)')
+_SCORE_RE = re.compile(rb'"score"\s*:\s*(-?[0-9.eE+-]+)')
+
+
+def _array(payload, key: bytes, length: int):
+    """
+    Vrni izsek payload[:length] s tabelo ploskih objektov pod ključem key
+    ali None, če je ne najdemo.
+    """
+    start = payload.find(key, 0, length)
+    if start < 0:
+        return None
+    start = payload.find(b'[', start + len(key), length)
+    if start < 0:
+        return None
+    if payload[start + 1:start + 2] == b']':
+        return b'[]'
+    end = payload.find(b'}]', start, length)
+    if end >= 0:
+        return payload[start:end + 2]
+    # Med objekti so lahko presledki.
+    end = _OBJECTS_END_RE.search(payload, start, length)
+    if end is None:
+        return None
+    return payload[start:end.end()]
+
+
+def _scores(payload, length: int):
+    """
+    Vrni slovar ekipa -> izsek s točkami za ekipi team1 in team2 ali None.
+    Ključ "score" imata le objekta ekip; ekipo določa zadnji ključ "team
+    pred njim (košare so v polju field, ki je pred ekipama ali za njima).
+    """
+    scores = {}
+    start = 0
+    while True:
+        match = _SCORE_RE.search(payload, start, length)
+        if match is None:
+            break
+        key = payload.rfind(b'"team', 0, match.start())
+        if key < 0:
+            return None
+        scores[bytes(payload[key + 1:key + 6]).decode()] = match.group(1)
+        start = match.end()
+    if 'team1' not in scores or 'team2' not in scores:
+        return None
+    return scores
+
+
+class GameState:
+    """
+    Stanje tekme iz zadnjega uspešno razčlenjenega sporočila strežnika.
+
+    Privzeto vsako sporočilo razčlenimo v celoti. Pri selektivnem
+    razčlenjevanju (selective=True) prvo sporočilo razčlenimo v celoti (load),
+    da dobimo nespremenljive podatke (polje, košare, ekipe). Iz vsakega
+    naslednjega sporočila (update) izluščimo le robots, apples, gameOn,
+    timeLeft in točke obeh ekip; ostalih delov sporočila ne razčlenjujemo.
+    Tabeli robots in apples sta ves čas isti objekt, osvežimo le njuno vsebino.
+
+    Do podatkov dostopamo enako kot do slovarja iz ujson.loads: game_state['apples'].
+    Ob napaki pri razčlenjevanju ostane prejšnje stanje.
+    """
+
+    def __init__(self, selective: bool = False):
+        """
+        Argumenti:
+        selective: ali naslednja sporočila razčlenjujemo selektivno;
+                   vklopi le, če bench_decode.py na posnetih sporočilih pokaže pohitritev
+        """
+        self.selective = selective
+        self._data = {}
+        self.robots = []
+        self.apples = []
+        self.game_on = False
+        self.time_left = 0
+        # Število sporočil, ki jih ni bilo mogoče razčleniti selektivno.
+        self.full_parses = 0
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def load(self, payload) -> bool:
+        """
+        Celotno razčlenjevanje sporočila (bytes, bytearray ali str). Vrne False ob napaki.
+        """
+        try:
+            data = ujson.loads(payload)
+        except ValueError:
+            return False
+        if not isinstance(data, dict):
+            return False
+        self._data = data
+        self._set_dynamic(data.get('robots', []), data.get('apples', []),
+                          data.get('gameOn', False), data.get('timeLeft', 0))
+        return True
+
+    def update(self, payload, length: int = None) -> bool:
+        """
+        Razčleni sporočilo iz pomnilnika za sprejem. Vrne False ob napaki.
+        Če pri selektivnem razčlenjevanju sporočilo nima pričakovane oblike,
+        ga razčlenimo v celoti.
+
+        Argumenti:
+        payload: sporočilo (bytes) ali pomnilnik za sprejem (bytearray)
+        length: dolžina sporočila v pomnilniku; privzeto len(payload)
+        """
+        if length is None:
+            length = len(payload)
+        if not self.selective or not self._data:
+            return self.load(payload if length == len(payload) else payload[:length])
+        # Iščemo neposredno v pomnilniku; kopiramo le izseka z roboti in jabolki.
+        robots = _array(payload, b'"robots"', length)
+        apples = _array(payload, b'"apples"', length)
+        game_on = _GAME_ON_RE.search(payload, 0, length)
+        time_left = _TIME_LEFT_RE.search(payload, 0, length)
+        scores = _scores(payload, length)
+        if robots is None or apples is None or game_on is None or time_left is None \
+                or scores is None or 'team1' not in self._data or 'team2' not in self._data:
+            self.full_parses += 1
+            return self.load(payload[:length])
+        try:
+            robots = ujson.loads(robots)
+            apples = ujson.loads(apples)
+            time_left = ujson.loads(time_left.group(1))
+            score1 = ujson.loads(scores['team1'])
+            score2 = ujson.loads(scores['team2'])
+        except ValueError:
+            self.full_parses += 1
+            return self.load(payload[:length])
+        self._set_dynamic(robots, apples, game_on.group(1) == b'true', time_left)
+        self._data['team1']['score'] = score1
+        self._data['team2']['score'] = score2
+        return True
+
+    def _set_dynamic(self, robots, apples, game_on, time_left):
+        self.robots[:] = robots
+        self.apples[:] = apples
+        self.game_on = game_on
+        self.time_left = time_left
+        data = self._data
+        data['robots'] = self.robots
+        data['apples'] = self.apples
+        data['gameOn'] = game_on
+        data['timeLeft'] = time_left
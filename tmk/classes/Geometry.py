@@ -0,0 +1,66 @@
+# tu so implementirane geometrijske poizvedbe nad ovirami na poligonu
+
+import math
+import numpy as np
+
+
+def to_local(xs, ys, x: float, y: float, direction: float):
+    """
+    Pretvori točke (xs, ys) v koordinatni sistem z izhodiščem v (x, y),
+    katerega os x kaže v smer direction [stopinje].
+    Vrne (along, across): razdaljo vzdolž smeri in bočni odmik.
+    """
+    rad = math.radians(direction)
+    cos_d = math.cos(rad)
+    sin_d = math.sin(rad)
+    dx = np.asarray(xs, dtype=float) - x
+    dy = np.asarray(ys, dtype=float) - y
+    return dx * cos_d + dy * sin_d, dy * cos_d - dx * sin_d
+
+
+def box_contains(xs, ys, x: float, y: float, direction: float, length: float, half_width: float):
+    """
+    Za vsako točko vrne, ali leži v orientiranem pravokotniku, ki se začne
+    v (x, y), je dolg length v smeri direction in širok 2 * half_width.
+    """
+    along, across = to_local(xs, ys, x, y, direction)
+    return (along >= 0) & (along <= length) & (np.abs(across) <= half_width)
+
+
+def swept_circle_distances(xs, ys, radii, x: float, y: float, direction: float, length: float, radius: float):
+    """
+    Krog s polmerom radius se premakne iz (x, y) za length v smeri direction.
+    Za vsako okroglo oviro (xs, ys, radii) vrne razdaljo, po kateri jo krog
+    zadane, oziroma inf, če je ne zadane.
+    """
+    along, across = to_local(xs, ys, x, y, direction)
+    reach = np.asarray(radii, dtype=float) + radius
+    overlap = reach * reach - across * across
+    root = np.sqrt(np.maximum(overlap, 0))
+    # Ovire, ki se nas že dotikajo, zadanemo takoj.
+    dist = np.maximum(along - root, 0)
+    # Krog mora oviro zapustiti pred nami; ovire za nami niso na poti.
+    hit = (overlap > 0) & (along + root >= 0) & (dist <= length)
+    return np.where(hit, dist, math.inf)
+
+
+def first_hit(xs, ys, radii, x: float, y: float, direction: float, length: float, radius: float):
+    """
+    Vrne (indeks, razdalja) prve ovire, ki jo zadane premikajoči se krog,
+    oziroma (None, inf), če je pot prosta.
+
+    Nasprotnik za robotom ni na poti, razen če se ga že dotikamo:
+    >>> first_hit([-220], [60], [150], 0, 0, 0, 500, 75)
+    (None, inf)
+    >>> first_hit([-100], [0], [150], 0, 0, 0, 500, 75)
+    (0, 0.0)
+    >>> first_hit([300], [0], [150], 0, 0, 0, 500, 75)
+    (0, 75.0)
+    """
+    if len(xs) == 0:
+        return None, math.inf
+    dist = swept_circle_distances(xs, ys, radii, x, y, direction, length, radius)
+    index = int(np.argmin(dist))
+    if dist[index] == math.inf:
+        return None, math.inf
+    return index, float(dist[index])
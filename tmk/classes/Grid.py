@@ -0,0 +1,81 @@
+# tu je implementiran razred "Grid"
+
+import math
+import numpy as np
+
+
+class Grid:
+    """
+    Mreža celic nad poligonom: pretvorba med milimetri na poligonu in
+    celicami (x, y). Celica (0, 0) je v kotu (x_min, y_min), vse celice so
+    kvadrati s stranico resolution. Uporabljajo jo vsi iskalniki poti in
+    risanje, zato se pretvorbe ne podvajajo.
+    """
+
+    def __init__(self, x_min: float, y_min: float, x_max: float, y_max: float, resolution: float = 60):
+        """
+        Argumenti:
+        x_min, y_min, x_max, y_max: meje poligona [mm]
+        resolution: velikost celice [mm]; manjša da boljše poti in počasnejše iskanje
+        """
+        self.origin = (x_min, y_min)
+        self.bounds = (x_min, y_min, x_max, y_max)
+        self.resolution = resolution
+        self.shape = (max(1, int(math.ceil((x_max - x_min) / resolution))),
+                      max(1, int(math.ceil((y_max - y_min) / resolution))))
+
+    @classmethod
+    def from_field(cls, field: dict, resolution: float = 60):
+        """
+        Mreža za poligon iz game_state['field'].
+        """
+        corners = [field[name] for name in ('topLeft', 'topRight', 'bottomLeft', 'bottomRight')]
+        xs = [corner[0] for corner in corners]
+        ys = [corner[1] for corner in corners]
+        return cls(min(xs), min(ys), max(xs), max(ys), resolution)
+
+    def __str__(self):
+        return 'Grid(%dx%d, %g mm)' % (self.shape[0], self.shape[1], self.resolution)
+
+    def contains(self, x: float, y: float) -> bool:
+        return self.bounds[0] <= x < self.bounds[2] and self.bounds[1] <= y < self.bounds[3]
+
+    def cell(self, x: float, y: float):
+        """
+        Celica, v kateri leži točka (x, y) [mm]; točke zunaj poligona
+        preslikamo v najbližjo robno celico.
+        """
+        return (min(self.shape[0] - 1, max(0, int((x - self.origin[0]) // self.resolution))),
+                min(self.shape[1] - 1, max(0, int((y - self.origin[1]) // self.resolution))))
+
+    def centre(self, cell):
+        """
+        Središče celice (x, y) [mm].
+        """
+        return (self.origin[0] + (cell[0] + 0.5) * self.resolution,
+                self.origin[1] + (cell[1] + 0.5) * self.resolution)
+
+    def to_field(self, cells):
+        """
+        Seznam celic pretvori v seznam točk [mm] (središča celic).
+        """
+        return [self.centre(cell) for cell in cells]
+
+    def centres(self):
+        """
+        Koordinati središč vseh stolpcev in vrstic: (xs, ys) [mm].
+        """
+        return (self.origin[0] + (np.arange(self.shape[0]) + 0.5) * self.resolution,
+                self.origin[1] + (np.arange(self.shape[1]) + 0.5) * self.resolution)
+
+    def window(self, x0: float, y0: float, x1: float, y1: float):
+        """
+        Celice, ki jih pokriva pravokotnik [x0, x1] x [y0, y1] [mm], kot
+        (ix0, ix1, iy0, iy1) za rezanje tabel [ix0:ix1, iy0:iy1]; prazen, če
+        je pravokotnik zunaj mreže.
+        """
+        ix0 = max(0, int((x0 - self.origin[0]) // self.resolution))
+        iy0 = max(0, int((y0 - self.origin[1]) // self.resolution))
+        ix1 = min(self.shape[0], int((x1 - self.origin[0]) // self.resolution) + 1)
+        iy1 = min(self.shape[1], int((y1 - self.origin[1]) // self.resolution) + 1)
+        return ix0, max(ix0, ix1), iy0, max(iy0, iy1)
@@ -0,0 +1,121 @@
+# tu so implementirane funkcije za risanje mreže polja v sliko RGB in zapis slike PNG
+
+import struct
+import zlib
+import numpy as np
+
+# Barve (enake kot pri risanju z graphics.py v pathfinding.py).
+WHITE = (255, 255, 255)
+BLOCKED = (90, 90, 90)
+MARGIN = (200, 200, 200)
+EXPLORED = (255, 255, 0)
+PATH = (0, 255, 255)
+START = (255, 0, 0)
+END = (0, 255, 0)
+APPLE_GOOD = (255, 0, 255)
+APPLE_BAD = (120, 60, 0)
+ROBOT_OURS = (0, 0, 255)
+ROBOT_ENEMY = (0, 0, 0)
+
+
+def compose(shape, layers, background=WHITE):
+    """
+    Mreža barv [x][y] velikosti shape. layers je seznam (maska, barva);
+    kasnejše plasti prekrijejo prejšnje.
+    """
+    grid = np.empty((shape[0], shape[1], 3), dtype=np.uint8)
+    grid[:] = background
+    for mask, colour in layers:
+        grid[mask] = colour
+    return grid
+
+
+def disc_mask(shape, cells, radius: float):
+    """
+    Maska celic, ki so od katere od celic cells oddaljene največ radius celic.
+    """
+    mask = np.zeros(shape, dtype=bool)
+    if not len(cells):
+        return mask
+    xs = np.arange(shape[0])[:, None]
+    ys = np.arange(shape[1])[None, :]
+    for cx, cy in cells:
+        mask |= (xs - cx) ** 2 + (ys - cy) ** 2 <= radius * radius
+    return mask
+
+
+def cells_mask(shape, cells):
+    """
+    Maska, v kateri so celice cells (seznam (x, y)) True.
+    """
+    mask = np.zeros(shape, dtype=bool)
+    if cells is not None and len(cells):
+        xs, ys = np.asarray(cells).T
+        mask[xs, ys] = True
+    return mask
+
+
+def to_image(grid, scale: int = 4):
+    """
+    Mrežo [x][y] pretvori v sliko (vrstice, stolpci, 3) z osjo y navzgor
+    in vsako celico poveča na scale x scale slikovnih točk.
+    """
+    image = grid.transpose(1, 0, 2)[::-1]
+    return image.repeat(scale, axis=0).repeat(scale, axis=1)
+
+
+def render(blocked, weights=None, explored=None, path=None, apples=(), robots=(), scale: int = 4):
+    """
+    Slika stanja načrtovanja poti.
+
+    Argumenti:
+    blocked: 2D tabela [x][y], True za zasedene celice
+    weights: množitelji cene celic (CostMap.weights); celice nad 1 so mehka meja
+    explored: 2D tabela [x][y], True za preiskane celice, ali None
+    path: seznam celic poti od začetka do cilja ali None
+    apples: seznam (celica, tip), tip je 'appleGood' ali 'appleBad'
+    robots: seznam (celica, ali je naš)
+    scale: velikost celice v slikovnih točkah
+    """
+    blocked = np.asarray(blocked, dtype=bool)
+    shape = blocked.shape
+    layers = []
+    if weights is not None:
+        layers.append((np.asarray(weights) > 1, MARGIN))
+    layers.append((blocked, BLOCKED))
+    if explored is not None:
+        layers.append((np.asarray(explored, dtype=bool) & ~blocked, EXPLORED))
+    if path:
+        layers.append((cells_mask(shape, path), PATH))
+        layers.append((cells_mask(shape, path[:1]), START))
+        layers.append((cells_mask(shape, path[-1:]), END))
+    layers.append((disc_mask(shape, [cell for cell, kind in apples if kind == 'appleGood'], 1), APPLE_GOOD))
+    layers.append((disc_mask(shape, [cell for cell, kind in apples if kind != 'appleGood'], 1), APPLE_BAD))
+    layers.append((disc_mask(shape, [cell for cell, ours in robots if ours], 2), ROBOT_OURS))
+    layers.append((disc_mask(shape, [cell for cell, ours in robots if not ours], 2), ROBOT_ENEMY))
+    return to_image(compose(shape, layers), scale)
+
+
+def png_bytes(image) -> bytes:
+    """
+    Sliko (vrstice, stolpci, 3) uint8 zapiši v obliki PNG (brez knjižnice PIL).
+    """
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    height, width = image.shape[:2]
+    # Vsaka vrstica se začne z bajtom filtra (0 = brez filtra).
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = image.reshape(height, width * 3)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    return b''.join((
+        b'\x89PNG\r\n\x1a\n',
+        chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)),
+        chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)),
+        chunk(b'IEND', b'')))
+
+
+def write_png(filename: str, image):
+    with open(filename, 'wb') as f:
+        f.write(png_bytes(image))
@@ -0,0 +1,263 @@
+# tu so implementirani iskalniki poti po mreži polja (A* in Jump Point Search)
+
+import heapq
+import numpy as np
+
+# Cena premika naravnost in diagonalno (enako kot calc_cost v pathfinding.py).
+STRAIGHT_COST = 10
+DIAGONAL_COST = 14
+
+# Smeri premikov (dx, dy).
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def octile(x1: int, y1: int, x2: int, y2: int) -> int:
+    """
+    Cena najkrajše poti med celicama na prazni mreži z 8 sosedi.
+    """
+    dx = abs(x1 - x2)
+    dy = abs(y1 - y2)
+    if dx < dy:
+        dx, dy = dy, dx
+    return DIAGONAL_COST * dy + STRAIGHT_COST * (dx - dy)
+
+
+def _prepare(blocked, start):
+    """
+    Pretvori zasedenost v ploščat seznam prostih celic z robom zasedenih celic,
+    da pri sosedih ni treba preverjati mej. Celica (x, y) ima indeks
+    (x + 1) * stride + (y + 1). Začetna celica je vedno prosta.
+    """
+    blocked = np.asarray(blocked, dtype=bool)
+    width, height = blocked.shape
+    padded = np.ones((width + 2, height + 2), dtype=bool)
+    padded[1:-1, 1:-1] = blocked
+    padded[start[0] + 1, start[1] + 1] = False
+    return (~padded).ravel().tolist(), height + 2
+
+
+def _cell(index: int, stride: int):
+    x, y = divmod(index, stride)
+    return x - 1, y - 1
+
+
+def _path(parent, node: int, stride: int):
+    path = []
+    while node is not None:
+        path.append(_cell(node, stride))
+        node = parent[node]
+    path.reverse()
+    return path
+
+
+def astar(blocked, start, goal, weights=None):
+    """
+    A* po mreži z 8 sosedi. Diagonalni premik je dovoljen le, če sta prosti
+    obe sosednji celici (ne režemo vogalov ovir).
+
+    Argumenti:
+    blocked: 2D tabela [x][y], True za zasedene celice
+    start, goal: celici (x, y)
+    weights: 2D tabela [x][y] množiteljev cene vstopa v celico (>= 1) ali None
+
+    Vrne (pot, število razširjenih celic); pot je seznam celic od start do
+    goal ali None, če poti ni.
+    """
+    free, stride = _prepare(blocked, start)
+    s = (start[0] + 1) * stride + start[1] + 1
+    g = (goal[0] + 1) * stride + goal[1] + 1
+    if not free[g]:
+        return None, 0
+    cost = None
+    if weights is not None:
+        padded = np.ones((len(free) // stride, stride))
+        padded[1:-1, 1:-1] = weights
+        cost = padded.ravel().tolist()
+    gx, gy = goal
+    steps = [(dx * stride + dy, dx * stride, dy, DIAGONAL_COST if dx and dy else STRAIGHT_COST)
+             for dx, dy in DIRECTIONS]
+
+    g_cost = {s: 0}
+    parent = {s: None}
+    closed = bytearray(len(free))
+    heap = [(octile(start[0], start[1], gx, gy), 0, s)]
+    expanded = 0
+    while heap:
+        f, node_g, node = heapq.heappop(heap)
+        if closed[node]:
+            continue
+        closed[node] = 1
+        expanded += 1
+        if node == g:
+            return _path(parent, node, stride), expanded
+        for step, step_x, step_y, step_cost in steps:
+            nb = node + step
+            if not free[nb] or closed[nb]:
+                continue
+            if step_x and step_y and not (free[node + step_x] and free[node + step_y]):
+                continue
+            new_g = node_g + (step_cost if cost is None else step_cost * cost[nb])
+            if new_g < g_cost.get(nb, float('inf')):
+                g_cost[nb] = new_g
+                parent[nb] = node
+                x, y = divmod(nb, stride)
+                heapq.heappush(heap, (new_g + octile(x - 1, y - 1, gx, gy), new_g, nb))
+    return None, expanded
+
+
+def _jump(free, stride: int, x: int, y: int, dx: int, dy: int, goal: int):
+    """
+    Iz celice (x, y) (oštevilčene z robom) skači v smeri (dx, dy), dokler ne
+    najdeš skakalne točke. Vrne njen indeks ali None.
+    """
+    while True:
+        i = x * stride + y
+        if not free[i]:
+            return None
+        if i == goal:
+            return i
+        if dx and dy:
+            # Pri diagonalnem premiku preverimo vodoravno in navpično smer.
+            if _jump(free, stride, x + dx, y, dx, 0, goal) is not None \
+                    or _jump(free, stride, x, y + dy, 0, dy, goal) is not None:
+                return i
+            if not (free[i + dx * stride] and free[i + dy]):
+                return None
+        elif dx:
+            if (free[i - 1] and not free[i - dx * stride - 1]) \
+                    or (free[i + 1] and not free[i - dx * stride + 1]):
+                return i
+        else:
+            if (free[i - stride] and not free[i - stride - dy]) \
+                    or (free[i + stride] and not free[i + stride - dy]):
+                return i
+        x += dx
+        y += dy
+
+
+def _jps_directions(free, stride: int, node: int, parent):
+    """
+    Smeri, ki jih moramo preiskati iz celice node glede na smer prihoda.
+    """
+    if parent is None:
+        return [(dx, dy) for dx, dy in DIRECTIONS
+                if free[node + dx * stride + dy]
+                and (not (dx and dy) or (free[node + dx * stride] and free[node + dy]))]
+    x, y = divmod(node, stride)
+    px, py = divmod(parent, stride)
+    dx = (x > px) - (x < px)
+    dy = (y > py) - (y < py)
+    directions = []
+    if dx and dy:
+        vertical = free[node + dy]
+        horizontal = free[node + dx * stride]
+        if vertical:
+            directions.append((0, dy))
+        if horizontal:
+            directions.append((dx, 0))
+        if vertical and horizontal:
+            directions.append((dx, dy))
+    elif dx:
+        ahead = free[node + dx * stride]
+        up = free[node + 1]
+        down = free[node - 1]
+        if ahead:
+            directions.append((dx, 0))
+            if up:
+                directions.append((dx, 1))
+            if down:
+                directions.append((dx, -1))
+        if up:
+            directions.append((0, 1))
+        if down:
+            directions.append((0, -1))
+    else:
+        ahead = free[node + dy]
+        right = free[node + stride]
+        left = free[node - stride]
+        if ahead:
+            directions.append((0, dy))
+            if right:
+                directions.append((1, dy))
+            if left:
+                directions.append((-1, dy))
+        if right:
+            directions.append((1, 0))
+        if left:
+            directions.append((-1, 0))
+    return directions
+
+
+def jps(blocked, start, goal):
+    """
+    Jump Point Search po mreži z enako ceno vseh prostih celic. Vrne enako
+    dolgo pot kot astar (brez uteži), a razširi precej manj celic.
+    Argumenti in rezultat so enaki kot pri astar; pot vsebuje vse celice.
+    """
+    free, stride = _prepare(blocked, start)
+    s = (start[0] + 1) * stride + start[1] + 1
+    g = (goal[0] + 1) * stride + goal[1] + 1
+    if not free[g]:
+        return None, 0
+    gx, gy = goal[0] + 1, goal[1] + 1
+
+    g_cost = {s: 0}
+    parent = {s: None}
+    closed = bytearray(len(free))
+    heap = [(octile(start[0], start[1], goal[0], goal[1]), 0, s)]
+    expanded = 0
+    while heap:
+        f, node_g, node = heapq.heappop(heap)
+        if closed[node]:
+            continue
+        closed[node] = 1
+        expanded += 1
+        if node == g:
+            return _expand(_path(parent, node, stride)), expanded
+        x, y = divmod(node, stride)
+        for dx, dy in _jps_directions(free, stride, node, parent[node]):
+            point = _jump(free, stride, x + dx, y + dy, dx, dy, g)
+            if point is None or closed[point]:
+                continue
+            jx, jy = divmod(point, stride)
+            new_g = node_g + octile(x, y, jx, jy)
+            if new_g < g_cost.get(point, float('inf')):
+                g_cost[point] = new_g
+                parent[point] = node
+                heapq.heappush(heap, (new_g + octile(jx, jy, gx, gy), new_g, point))
+    return None, expanded
+
+
+def _expand(points):
+    """
+    Med zaporednimi skakalnimi točkami (ki ležijo na isti premici ali
+    diagonali) dodaj vse vmesne celice.
+    """
+    path = [points[0]]
+    for x, y in points[1:]:
+        px, py = path[-1]
+        dx = (x > px) - (x < px)
+        dy = (y > py) - (y < py)
+        while (px, py) != (x, y):
+            px += dx
+            py += dy
+            path.append((px, py))
+    return path
+
+
+def find_path(blocked, start, goal, weights=None):
+    """
+    Poišči pot z JPS, če imajo vse proste celice enako ceno, sicer z A*.
+    """
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float)
+        if not np.all(weights[~np.asarray(blocked, dtype=bool)] == 1):
+            return astar(blocked, start, goal, weights)
+    return jps(blocked, start, goal)
+
+
+def path_cost(path) -> int:
+    """
+    Cena poti (seznam celic) z enakimi utežmi, kot jih uporabljata iskalnika.
+    """
+    return sum(octile(x1, y1, x2, y2) for (x1, y1), (x2, y2) in zip(path, path[1:]))
@@ -0,0 +1,48 @@
+# tu je implementiran razred "LatencyStats"
+
+import math
+
+
+class LatencyStats:
+    """
+    Zbiranje meritev zakasnitve in izračun percentilov.
+    """
+
+    def __init__(self):
+        self._samples = []
+
+    def __len__(self):
+        return len(self._samples)
+
+    def add(self, value: float):
+        self._samples.append(value)
+
+    def percentile(self, p: float) -> float:
+        """
+        Percentil p (0-100) po metodi najbližjega ranga; nan, če ni meritev.
+        """
+        if not self._samples:
+            return math.nan
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def maximum(self) -> float:
+        return max(self._samples) if self._samples else math.nan
+
+    def summary(self) -> dict:
+        """
+        Povzetek meritev: število, p50, p95, p99 in največja vrednost.
+        """
+        return {
+            'n': len(self._samples),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.maximum(),
+        }
+
+    def __str__(self):
+        s = self.summary()
+        return 'p50 %.1f ms, p95 %.1f ms, p99 %.1f ms, max %.1f ms (n=%d)' % (
+            s['p50'] * 1000, s['p95'] * 1000, s['p99'] * 1000, s['max'] * 1000, s['n'])
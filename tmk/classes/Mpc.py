@@ -0,0 +1,103 @@
+# tu je implementiran razred "MPC"
+
+import math
+import numpy as np
+
+
+class MPC:
+    """
+    Prediktivni regulator za zadnji del približevanja jabolku.
+
+    Za vsak par hitrosti koles iz mreže vzorcev simuliramo kinematiko
+    diferencialnega pogona na kratkem horizontu in izberemo par, pri katerem
+    točka med kleščami najbolje zadane jabolko, robot pa je obrnjen proti njemu.
+    Ker so ukazi na horizontu konstantni, so poti v koordinatnem sistemu
+    robota vedno enake; izračunamo jih enkrat, v zanki jih le zavrtimo
+    in premaknemo na trenutno pozicijo robota.
+    """
+
+    def __init__(
+            self,
+            wheel_base: float,
+            mm_per_deg: float,
+            claw_offset: float,
+            speed_max: float,
+            samples: int = 11,
+            horizon: int = 15,
+            dt: float = 0.1,
+            heading_weight: float = 10000,
+            time_weight: float = 100):
+        """
+        Argumenti:
+        wheel_base: razdalja med kolesoma [mm]
+        mm_per_deg: pot kolesa na stopinjo zasuka motorja [mm]
+        claw_offset: oddaljenost točke med kleščami od središča robota [mm]
+        speed_max: največja hitrost koles pri približevanju [°/s]
+        samples: število vzorcev hitrosti za posamezno kolo
+        horizon: število korakov simulacije
+        dt: dolžina koraka simulacije [s]
+        heading_weight: utež napake smeri [mm^2 / rad^2]
+        time_weight: utež časa do zadetka [mm^2 / korak]
+        """
+        self._claw_offset = claw_offset
+
+        speeds = np.linspace(-speed_max, speed_max, samples)
+        left, right = np.meshgrid(speeds, speeds)
+        self._left = left.ravel()
+        self._right = right.ravel()
+
+        # Hitrost [mm/s] in kotna hitrost [rad/s] za vsak par ukazov.
+        v = (self._left + self._right) / 2 * mm_per_deg
+        w = (self._right - self._left) * mm_per_deg / wheel_base
+        t = dt * np.arange(1, horizon + 1)
+        v = v[:, np.newaxis]
+        w = w[:, np.newaxis]
+        wt = w * t
+        straight = np.abs(w) < 1e-9
+        w_safe = np.where(straight, 1, w)
+        # Poti v koordinatnem sistemu robota (vožnja po loku ali naravnost).
+        self._local_x = np.where(straight, v * t, v / w_safe * np.sin(wt))
+        self._local_y = np.where(straight, 0, v / w_safe * (1 - np.cos(wt)))
+        self._local_th = wt
+
+        self._heading_weight = heading_weight
+        self._step_cost = time_weight * np.arange(horizon)
+
+    def claw_point(self, pos, direction: float):
+        """
+        Vrni (x, y) točke med kleščami za robota na poziciji pos s smerjo direction.
+        """
+        rad = math.radians(direction)
+        return (pos.x + self._claw_offset * math.cos(rad),
+                pos.y + self._claw_offset * math.sin(rad))
+
+    def claw_on_target(self, pos, direction: float, target, tolerance: float) -> bool:
+        """
+        Ali je točka med kleščami od cilja oddaljena manj kot tolerance [mm]?
+        """
+        claw_x, claw_y = self.claw_point(pos, direction)
+        return math.hypot(target.x - claw_x, target.y - claw_y) < tolerance
+
+    def control(self, pos, direction: float, target):
+        """
+        Vrni hitrosti (levo, desno) kolo, ki robota najbolje pripeljejo
+        s kleščami na cilj.
+        """
+        rad = math.radians(direction)
+        cos_d = math.cos(rad)
+        sin_d = math.sin(rad)
+        x = pos.x + cos_d * self._local_x - sin_d * self._local_y
+        y = pos.y + sin_d * self._local_x + cos_d * self._local_y
+        th = rad + self._local_th
+
+        claw_x = x + self._claw_offset * np.cos(th)
+        claw_y = y + self._claw_offset * np.sin(th)
+        dist_sq = (claw_x - target.x) ** 2 + (claw_y - target.y) ** 2
+
+        # Napaka smeri: cilj naj bo točno pred robotom.
+        heading_err = np.arctan2(target.y - y, target.x - x) - th
+        heading_err = (heading_err + math.pi) % (2 * math.pi) - math.pi
+
+        cost = dist_sq + self._heading_weight * heading_err ** 2 + self._step_cost
+        best = int(np.argmin(cost.min(axis=1)))
+        return float(self._left[best]), float(self._right[best])
@@ -0,0 +1,92 @@
+# tu je implementiran razred "PathCache"
+
+from collections import OrderedDict
+
+from .GridSearch import find_path
+
+
+class PathCache:
+    """
+    Predpomnilnik poti (LRU) za pogoste poti: domov, do iste skupine jabolk,
+    do nasprotnikovega doma. Ključ je (začetna celica, ciljna celica), poleg
+    poti hranimo različico mreže (CostMap.version), za katero je bila izračunana.
+
+    Če se je mreža od takrat spremenila, preverimo le celice poti, ki ležijo
+    v spremenjenih pravokotnikih (CostMap.changed_since). Če je pot še prosta,
+    jo uporabimo znova, sicer jo izračunamo na novo.
+    """
+
+    def __init__(self, capacity: int = 32, planner=find_path):
+        """
+        Argumenti:
+        capacity: največje število shranjenih poti
+        planner: iskalnik poti z vmesnikom GridSearch.find_path
+        """
+        self._capacity = capacity
+        self._planner = planner
+        self._entries = OrderedDict()
+        # Števci za izpis po tekmi.
+        self.hits = 0
+        self.misses = 0
+        self.validations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def find_path(self, cost_map, start, goal):
+        """
+        Pot od celice start do celice goal na mreži cost_map (CostMap).
+        Vrne (pot, število razširjenih celic); pri zadetku je število 0.
+        """
+        key = (tuple(start), tuple(goal))
+        entry = self._entries.get(key)
+        if entry is not None:
+            path, version = entry
+            if version == cost_map.version:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return path, 0
+            self.validations += 1
+            if self._still_free(cost_map, path, version):
+                self.hits += 1
+                self._entries[key] = (path, cost_map.version)
+                self._entries.move_to_end(key)
+                return path, 0
+            self.invalidations += 1
+            del self._entries[key]
+
+        self.misses += 1
+        path, expanded = self._planner(cost_map.blocked(), start, goal, cost_map.weights())
+        if path is not None:
+            self._entries[key] = (path, cost_map.version)
+            if len(self._entries) > self._capacity:
+                self._entries.popitem(last=False)
+        return path, expanded
+
+    @staticmethod
+    def _still_free(cost_map, path, version) -> bool:
+        """
+        Ali je pot, izračunana pri različici version, še prosta.
+        """
+        regions = cost_map.changed_since(version)
+        blocked = cost_map.blocked()
+        # Začetne celice ne preverjamo (robot je lahko že ob oviri).
+        for (px, py), (x, y) in zip(path, path[1:]):
+            # Korak (vključno z vogaloma diagonale) preverimo le, če seže v spremembo.
+            if regions is not None and not any(
+                    x0 <= max(px, x) and min(px, x) < x1 and y0 <= max(py, y) and min(py, y) < y1
+                    for x0, x1, y0, y1 in regions):
+                continue
+            if blocked[x, y]:
+                return False
+            if x != px and y != py and (blocked[px, y] or blocked[x, py]):
+                return False
+        return True
+
+    def stats(self) -> str:
+        return 'zadetki: %d, zgrešeni: %d, preverjanja: %d, neveljavne: %d' % (
+            self.hits, self.misses, self.validations, self.invalidations)
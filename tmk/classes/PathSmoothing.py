@@ -0,0 +1,80 @@
+# tu so implementirane funkcije za glajenje poti po mreži (vlečenje vrvice)
+
+import numpy as np
+
+
+def _line_cells(start, targets):
+    """
+    Celice daljic (Bresenham) od celice start do vsake od celic targets.
+    Vse daljice izračunamo hkrati.
+
+    Vrne (xs, ys, offsets): koordinate celic vseh daljic zaporedoma in
+    indekse, pri katerih se začne posamezna daljica.
+    """
+    targets = np.asarray(targets, dtype=np.int64).reshape(-1, 2)
+    dx = targets[:, 0] - start[0]
+    dy = targets[:, 1] - start[1]
+    steps = np.maximum(np.abs(dx), np.abs(dy))
+    counts = steps + 1
+    offsets = np.zeros(len(targets), dtype=np.int64)
+    np.cumsum(counts[:-1], out=offsets[1:])
+    segment = np.repeat(np.arange(len(targets)), counts)
+    t = np.arange(counts.sum()) - offsets[segment]
+    fraction = t / np.maximum(steps, 1)[segment]
+    # Zaokrožimo navzgor pri polovici (np.rint bi zaokrožil na sodo število).
+    xs = start[0] + np.floor(dx[segment] * fraction + 0.5).astype(np.int64)
+    ys = start[1] + np.floor(dy[segment] * fraction + 0.5).astype(np.int64)
+    return xs, ys, offsets
+
+
+def visible_from(blocked, start, targets):
+    """
+    Za vsako celico iz targets vrne, ali je daljica od start do nje prosta.
+    Kjer daljica preide diagonalno, morata biti prosti tudi obe sosednji
+    celici (enako pravilo kot pri iskalnikih v GridSearch, ne režemo vogalov).
+
+    Argumenti:
+    blocked: 2D tabela [x][y], True za zasedene celice
+    start: celica (x, y)
+    targets: seznam celic (x, y)
+    """
+    blocked = np.asarray(blocked, dtype=bool)
+    xs, ys, offsets = _line_cells(start, targets)
+    hit = blocked[xs, ys]
+    # Pri diagonalnem koraku preverimo še celici ob vogalu.
+    corner = np.zeros(len(xs), dtype=bool)
+    corner[1:] = (xs[1:] != xs[:-1]) & (ys[1:] != ys[:-1]) \
+        & (blocked[xs[1:], ys[:-1]] | blocked[xs[:-1], ys[1:]])
+    corner[offsets] = False
+    hit |= corner
+    # Začetne celice ne preverjamo: robot je lahko že ob oviri.
+    hit[offsets] = False
+    return ~np.logical_or.reduceat(hit, offsets)
+
+
+def line_of_sight(blocked, a, b) -> bool:
+    """
+    Ali lahko robot pelje naravnost od celice a do celice b.
+    """
+    return bool(visible_from(blocked, a, [b])[0])
+
+
+def string_pull(blocked, path):
+    """
+    Iz poti po celicah (npr. rezultat GridSearch.find_path) izpusti vse
+    celice, ki jih lahko povežemo z ravno daljico. Iz vsake ohranjene celice
+    skočimo na najbolj oddaljeno celico poti, ki jo vidimo.
+
+    Vrne seznam celic poti, v katerih robot zavije (z začetno in ciljno).
+    """
+    if path is None or len(path) < 3:
+        return path
+    corners = [path[0]]
+    i = 0
+    last = len(path) - 1
+    while i < last:
+        visible = visible_from(blocked, path[i], path[i + 1:])
+        # Sosednja celica poti je vedno vidna, zato je rezultat vsaj i + 1.
+        i += 1 + int(np.flatnonzero(visible)[-1])
+        corners.append(path[i])
+    return corners
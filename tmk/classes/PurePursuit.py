@@ -0,0 +1,119 @@
+# tu je implementiran razred "PurePursuit"
+
+import math
+
+
+class PurePursuit:
+    """
+    Sledenje poti po metodi "pure pursuit".
+
+    Robot ves čas cilja točko na poti, ki je od njega oddaljena za razdaljo
+    pogleda naprej (lookahead), in vozi po krožnem loku skozi njo.
+    Tako ne rabi stati na mestu in se obračati proti vsaki točki posebej.
+    """
+
+    def __init__(
+            self,
+            wheel_base: float,
+            lookahead_min: float,
+            lookahead_max: float,
+            lookahead_gain: float):
+        """
+        Argumenti:
+        wheel_base: razdalja med kolesoma [mm]
+        lookahead_min: najmanjša razdalja pogleda naprej [mm]
+        lookahead_max: največja razdalja pogleda naprej [mm]
+        lookahead_gain: za koliko mm se pogled podaljša na enoto hitrosti
+        """
+        self._wheel_base = wheel_base
+        self._lookahead_min = lookahead_min
+        self._lookahead_max = lookahead_max
+        self._lookahead_gain = lookahead_gain
+        self._path = []
+        self._index = 0
+
+    def set_path(self, waypoints):
+        """
+        Nastavi novo pot. Točke (objekti z atributoma x in y) so lahko
+        rezultat načrtovalnika poti ali pa kar ena sama ciljna točka.
+        """
+        self._path = list(waypoints)
+        self._index = 0
+
+    def lookahead(self, speed: float) -> float:
+        """
+        Razdalja pogleda naprej glede na trenutno hitrost.
+        """
+        dist = self._lookahead_min + self._lookahead_gain * abs(speed)
+        return min(max(dist, self._lookahead_min), self._lookahead_max)
+
+    def goal_point(self, pos, lookahead: float):
+        """
+        Vrni (x, y) točke na poti, ki jo robot cilja.
+        """
+        path = self._path
+        # Preskočimo točke, ki smo jih že dosegli (razen zadnje).
+        while self._index < len(path) - 1 and \
+                math.hypot(path[self._index].x - pos.x, path[self._index].y - pos.y) < lookahead:
+            self._index += 1
+
+        goal = path[self._index]
+        if self._index == 0:
+            # Pred prvo točko ciljamo točko na daljici od robota do nje,
+            # oddaljeno za lookahead; tako je zavijanje odvisno od hitrosti
+            # tudi, ko je pot le ena ciljna točka.
+            dx = goal.x - pos.x
+            dy = goal.y - pos.y
+            dist = math.hypot(dx, dy)
+            if dist <= lookahead:
+                return goal.x, goal.y
+            return pos.x + dx * lookahead / dist, pos.y + dy * lookahead / dist
+
+        # Presečišče krožnice okoli robota z odsekom med prejšnjo in trenutno točko.
+        prev = path[self._index - 1]
+        dx = goal.x - prev.x
+        dy = goal.y - prev.y
+        fx = prev.x - pos.x
+        fy = prev.y - pos.y
+        a = dx * dx + dy * dy
+        b = 2 * (fx * dx + fy * dy)
+        c = fx * fx + fy * fy - lookahead * lookahead
+        disc = b * b - 4 * a * c
+        if a == 0 or disc < 0:
+            return goal.x, goal.y
+        t = (-b + math.sqrt(disc)) / (2 * a)
+        if not 0 <= t <= 1:
+            return goal.x, goal.y
+        return prev.x + t * dx, prev.y + t * dy
+
+    def update(self, pos, direction: float, speed: float) -> float:
+        """
+        Izračunaj ukrivljenost loka [1/mm], po katerem naj robot vozi.
+        Pozitivna ukrivljenost pomeni zavijanje v levo.
+
+        Argumenti:
+        pos: trenutna pozicija robota
+        direction: smer robota [stopinje]
+        speed: trenutna nazivna hitrost robota
+        """
+        if not self._path:
+            return 0
+        goal_x, goal_y = self.goal_point(pos, self.lookahead(speed))
+        dx = goal_x - pos.x
+        dy = goal_y - pos.y
+        dist_sq = dx * dx + dy * dy
+        if dist_sq == 0:
+            return 0
+        # Bočni odmik cilja v koordinatnem sistemu robota.
+        rad = math.radians(direction)
+        y_local = -math.sin(rad) * dx + math.cos(rad) * dy
+        return 2 * y_local / dist_sq
+
+    def wheel_speeds(self, speed: float, curvature: float):
+        """
+        Pretvori nazivno hitrost in ukrivljenost v hitrosti (levo, desno) kolo.
+        Zavijanje omejimo tako, da se nobeno kolo ne vrti v nasprotno smer.
+        """
+        turn = curvature * self._wheel_base / 2
+        turn = min(max(turn, -1), 1)
+        return speed * (1 - turn), speed * (1 + turn)
@@ -0,0 +1,137 @@
+# tu je implementirano iskanje poti po prostoru in času (izogibanje nasprotniku)
+
+import heapq
+import math
+import numpy as np
+
+from .GridSearch import DIRECTIONS, DIAGONAL_COST, STRAIGHT_COST, _prepare, octile
+
+
+def moving_obstacle(predict, radius: float, slices: int, step_time: float, grid, growth: float = 0):
+    """
+    Celice, ki jih premikajoča se ovira zaseda v posameznih časovnih rezinah.
+
+    Argumenti:
+    predict: funkcija t -> (x, y) [mm], npr. EnemyTracker.predict
+    radius: polmer ovire, povečan za polmer našega robota [mm]
+    slices: število časovnih rezin
+    step_time: trajanje ene rezine [s]
+    grid: mreža celic nad poligonom (Grid)
+    growth: za koliko se polmer poveča na sekundo napovedi [mm/s],
+        ker je napoved z večanjem časa manj natančna
+
+    Vrne seznam množic celic (x, y), eno za vsako rezino.
+    """
+    occupied = []
+    for k in range(slices):
+        t = k * step_time
+        x, y = predict(t)
+        r = radius + growth * t
+        cx = (x - grid.origin[0]) / grid.resolution - 0.5
+        cy = (y - grid.origin[1]) / grid.resolution - 0.5
+        reach = r / grid.resolution
+        xs = np.arange(int(math.floor(cx - reach)), int(math.ceil(cx + reach)) + 1)
+        ys = np.arange(int(math.floor(cy - reach)), int(math.ceil(cy + reach)) + 1)
+        inside = np.add.outer((xs - cx) ** 2, (ys - cy) ** 2) <= reach * reach
+        i, j = np.nonzero(inside)
+        cells = set(zip(xs[i].tolist(), ys[j].tolist()))
+        occupied.append(cells)
+    return occupied
+
+
+def space_time_astar(blocked, start, goal, occupied, max_expanded: int = 2000, wait_cost: int = STRAIGHT_COST):
+    """
+    A* po stanjih (celica, časovna rezina). Robot v eni rezini pelje v sosednjo
+    celico ali počaka (cena wait_cost). V rezini k se ne sme znajti v celici
+    iz occupied[k]. Po zadnji rezini napovedi (obzorje) premikajočih ovir ne
+    upoštevamo več in iščemo le po prostoru.
+
+    Če bi bila celica, v kateri je robot, v naslednji rezini zasedena (npr.
+    robot je že znotraj razširjenega nasprotnika), se sme premakniti tudi v
+    zasedeno celico, ki ni bližje središču ovire, da se lahko umakne.
+
+    Argumenti:
+    blocked: 2D tabela [x][y], True za zasedene celice (stalne ovire)
+    start, goal: celici (x, y)
+    occupied: seznam množic celic po rezinah (moving_obstacle)
+    max_expanded: največ razširjenih stanj; omejuje čas in pomnilnik
+
+    Vrne (pot, število razširjenih stanj); pot ima eno celico za vsako rezino
+    (čakanje pomeni ponovljeno celico) ali je None, če poti v okviru omejitve ni.
+    """
+    free, stride = _prepare(blocked, start)
+    s = (start[0] + 1) * stride + start[1] + 1
+    g = (goal[0] + 1) * stride + goal[1] + 1
+    if not free[g]:
+        return None, 0
+    horizon = len(occupied)
+    # Zasedenost po rezinah v indeksih mreže z robom.
+    moving = [{(x + 1) * stride + y + 1 for x, y in cells
+               if 0 <= x < len(free) // stride - 2 and 0 <= y < stride - 2}
+              for cells in occupied]
+    # Središča ovire po rezinah v koordinatah mreže z robom (za umik).
+    centres = [(sum(x for x, _ in cells) / len(cells) + 1, sum(y for _, y in cells) / len(cells) + 1)
+               if cells else None for cells in occupied]
+    steps = [(dx * stride + dy, dx * stride, dy, DIAGONAL_COST if dx and dy else STRAIGHT_COST)
+             for dx, dy in DIRECTIONS]
+    gx, gy = goal
+
+    def heuristic(node):
+        x, y = divmod(node, stride)
+        return octile(x - 1, y - 1, gx, gy)
+
+    start_state = (s, 0)
+    g_cost = {start_state: 0}
+    parent = {start_state: None}
+    closed = set()
+    heap = [(heuristic(s), 0, s, 0)]
+    expanded = 0
+    while heap:
+        f, node_g, node, k = heapq.heappop(heap)
+        state = (node, k)
+        if state in closed:
+            continue
+        closed.add(state)
+        expanded += 1
+        if node == g:
+            path = []
+            while state is not None:
+                x, y = divmod(state[0], stride)
+                path.append((x - 1, y - 1))
+                state = parent[state]
+            path.reverse()
+            return path, expanded
+        if expanded >= max_expanded:
+            break
+        # Po obzorju čas ne teče več (stanja se ne podvajajo po rezinah).
+        nk = k + 1 if k < horizon else horizon
+        blocked_next = moving[nk] if nk < horizon else ()
+        candidates = [(node, wait_cost)] if nk < horizon else []
+        for step, step_x, step_y, step_cost in steps:
+            nb = node + step
+            if not free[nb]:
+                continue
+            if step_x and step_y and not (free[node + step_x] and free[node + step_y]):
+                continue
+            candidates.append((nb, step_cost))
+        escape = node in blocked_next and centres[nk] is not None
+        if escape:
+            cx, cy = centres[nk]
+            x, y = divmod(node, stride)
+            escape_dist = (x - cx) ** 2 + (y - cy) ** 2
+        for nb, step_cost in candidates:
+            if nb in blocked_next:
+                if not escape or nb == node:
+                    continue
+                x, y = divmod(nb, stride)
+                if (x - cx) ** 2 + (y - cy) ** 2 < escape_dist:
+                    continue
+            other = (nb, nk)
+            if other in closed:
+                continue
+            new_g = node_g + step_cost
+            if new_g < g_cost.get(other, new_g + 1):
+                g_cost[other] = new_g
+                parent[other] = state
+                heapq.heappush(heap, (new_g + heuristic(nb), new_g, nb, nk))
+    return None, expanded
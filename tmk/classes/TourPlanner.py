@@ -0,0 +1,249 @@
+# tu je implementiran razred "TourPlanner"
+
+import math
+
+# Oznake košar, iz katerih robot začne naslednjo pot.
+START = 0
+HOME = 1
+ENEMY_HOME = 2
+
+
+class TourPlanner:
+    """
+    Načrtovanje vrstnega reda pobiranja jabolk v preostalem času tekme.
+
+    Robot nosi po eno jabolko: zdravo odpelje v domačo košaro, gnilo pa
+    v nasprotnikovo. Čas poti do jabolka je zato odvisen le od tega,
+    v kateri košari je robot končal prejšnjo pot. Iščemo vrstni red,
+    ki v preostalem času prinese največ točk (ob enakih točkah najkrajši čas).
+    Za malo jabolk uporabimo dinamično programiranje, sicer požrešno izbiro
+    z izboljšavami 2-opt in vstavljanjem.
+    """
+
+    def __init__(
+            self,
+            speed: float,
+            handling_time: float,
+            good_score: float = 1,
+            bad_score: float = 1,
+            dp_max: int = 8,
+            move_eps: float = 50):
+        """
+        Argumenti:
+        speed: povprečna hitrost robota [mm/s]
+        handling_time: čas za pobiranje in odlaganje enega jabolka [s]
+        good_score: vrednost zdravega jabolka, pripeljanega domov
+        bad_score: vrednost gnilega jabolka, pripeljanega k nasprotniku
+        dp_max: največje število jabolk, za katero uporabimo dinamično programiranje
+        move_eps: premik jabolka [mm], pri katerem ponovno izračunamo njegove razdalje
+        """
+        self._speed = speed
+        self._handling_time = handling_time
+        self._good_score = good_score
+        self._bad_score = bad_score
+        self._dp_max = dp_max
+        self._move_eps = move_eps
+        # Podatki o jabolkih: id -> (x, y, košara, točke)
+        self._apples = {}
+        # Časi poti: id -> [iz START, iz HOME, iz ENEMY_HOME]
+        self._cost = {}
+        self._home = None
+        self._enemy_home = None
+        self._order = []
+
+    def update(self, apples, robot_pos, home, enemy_home, time_left: float):
+        """
+        Posodobi podatke o jabolkih in ponovno izračunaj vrstni red.
+
+        Argumenti:
+        apples: seznam jabolk (slovarji z id, position in type), ki jih želimo pobrati
+        robot_pos: trenutna pozicija robota
+        home: točka za odlaganje v domačo košaro
+        enemy_home: točka za odlaganje v nasprotnikovo košaro
+        time_left: preostali čas tekme [s]
+        """
+        baskets_moved = self._home is None or \
+            (self._home.x, self._home.y, self._enemy_home.x, self._enemy_home.y) != \
+            (home.x, home.y, enemy_home.x, enemy_home.y)
+        if baskets_moved:
+            self._apples = {}
+            self._cost = {}
+        self._home = home
+        self._enemy_home = enemy_home
+
+        seen = set()
+        for apple in apples:
+            apple_id = apple['id']
+            seen.add(apple_id)
+            x = apple['position'][0]
+            y = apple['position'][1]
+            old = self._apples.get(apple_id)
+            if old is not None and abs(old[0] - x) < self._move_eps and abs(old[1] - y) < self._move_eps:
+                continue
+            # Novo ali premaknjeno jabolko: izračunamo njegov stolpec matrike.
+            if apple['type'] == "appleGood":
+                basket = HOME
+                score = self._good_score
+                drop = home
+            else:
+                basket = ENEMY_HOME
+                score = self._bad_score
+                drop = enemy_home
+            to_basket = math.hypot(drop.x - x, drop.y - y)
+            self._apples[apple_id] = (x, y, basket, score)
+            self._cost[apple_id] = [
+                0,
+                (math.hypot(home.x - x, home.y - y) + to_basket) / self._speed + self._handling_time,
+                (math.hypot(enemy_home.x - x, enemy_home.y - y) + to_basket) / self._speed + self._handling_time]
+
+        for apple_id in list(self._apples):
+            if apple_id not in seen:
+                del self._apples[apple_id]
+                del self._cost[apple_id]
+
+        # Pot od robota se spreminja ves čas, zato jo vedno izračunamo znova.
+        for apple_id, (x, y, basket, score) in self._apples.items():
+            drop = home if basket == HOME else enemy_home
+            self._cost[apple_id][START] = \
+                (math.hypot(robot_pos.x - x, robot_pos.y - y) + math.hypot(drop.x - x, drop.y - y)) / \
+                self._speed + self._handling_time
+
+        ids = list(self._apples)
+        if len(ids) <= self._dp_max:
+            self._order = self._solve_dp(ids, time_left)
+        else:
+            self._order = self._solve_heuristic(ids, time_left)
+        return self._order
+
+    def next_apple(self):
+        """
+        Vrni id jabolka, ki ga je treba pobrati naslednjega (ali None).
+        """
+        if not self._order:
+            return None
+        return self._order[0]
+
+    def order(self):
+        """
+        Vrni celoten načrtovani vrstni red (seznam id-jev jabolk).
+        """
+        return list(self._order)
+
+    def _evaluate(self, order, time_left: float):
+        """
+        Vrni (točke, čas, dolžina) največjega začetka vrstnega reda,
+        ki ga še utegnemo opraviti.
+        """
+        score = 0
+        total = 0
+        basket = START
+        for n, apple_id in enumerate(order):
+            step = self._cost[apple_id][basket]
+            if total + step > time_left:
+                return score, total, n
+            total += step
+            score += self._apples[apple_id][3]
+            basket = self._apples[apple_id][2]
+        return score, total, len(order)
+
+    def _solve_dp(self, ids, time_left: float):
+        """
+        Natančna rešitev z dinamičnim programiranjem po podmnožicah jabolk
+        in košari, v kateri smo končali.
+        """
+        n = len(ids)
+        cost = [self._cost[apple_id] for apple_id in ids]
+        basket_of = [self._apples[apple_id][2] for apple_id in ids]
+        score_of = [self._apples[apple_id][3] for apple_id in ids]
+
+        # best[(mask, košara)] = (čas, prejšnje stanje, zadnje jabolko)
+        best = {(0, START): (0, None, None)}
+        layer = [(0, START)]
+        result = (0, 0, (0, START))
+        while layer:
+            next_layer = []
+            for mask, basket in layer:
+                t, _, _ = best[(mask, basket)]
+                for j in range(n):
+                    if mask & (1 << j):
+                        continue
+                    t_new = t + cost[j][basket]
+                    if t_new > time_left:
+                        continue
+                    key = (mask | (1 << j), basket_of[j])
+                    old = best.get(key)
+                    if old is None:
+                        next_layer.append(key)
+                    if old is None or t_new < old[0]:
+                        best[key] = (t_new, (mask, basket), j)
+            for key in next_layer:
+                mask = key[0]
+                score = sum(score_of[j] for j in range(n) if mask & (1 << j))
+                t = best[key][0]
+                if score > result[0] or (score == result[0] and t < result[1]):
+                    result = (score, t, key)
+            layer = next_layer
+
+        order = []
+        key = result[2]
+        while best[key][1] is not None:
+            order.append(ids[best[key][2]])
+            key = best[key][1]
+        order.reverse()
+        return order
+
+    def _solve_heuristic(self, ids, time_left: float):
+        """
+        Približna rešitev: prejšnji vrstni red (ali požrešna izbira),
+        dopolnjen z vstavljanjem novih jabolk in izboljšan z 2-opt.
+        """
+        order = [apple_id for apple_id in self._order if apple_id in self._apples]
+        if not order:
+            # Požrešno izbiramo jabolko z največ točkami na sekundo.
+            remaining = set(ids)
+            basket = START
+            total = 0
+            while remaining:
+                best_id = max(
+                    remaining,
+                    key=lambda a: self._apples[a][3] / self._cost[a][basket])
+                step = self._cost[best_id][basket]
+                if total + step > time_left:
+                    break
+                order.append(best_id)
+                remaining.remove(best_id)
+                total += step
+                basket = self._apples[best_id][2]
+
+        # Vstavljanje preostalih jabolk na najboljše mesto.
+        value = self._evaluate(order, time_left)
+        for apple_id in ids:
+            if apple_id in order:
+                continue
+            best_order = None
+            for i in range(len(order) + 1):
+                candidate = order[:i] + [apple_id] + order[i:]
+                candidate_value = self._evaluate(candidate, time_left)
+                if candidate_value[0] > value[0] or \
+                        (candidate_value[0] == value[0] and candidate_value[1] < value[1]):
+                    best_order = candidate
+                    value = candidate_value
+            if best_order is not None:
+                order = best_order
+
+        # 2-opt: obračanje odsekov, dokler se rešitev izboljšuje.
+        improved = True
+        while improved:
+            improved = False
+            for i in range(len(order) - 1):
+                for k in range(i + 1, len(order)):
+                    candidate = order[:i] + order[i:k + 1][::-1] + order[k + 1:]
+                    candidate_value = self._evaluate(candidate, time_left)
+                    if candidate_value[0] > value[0] or \
+                            (candidate_value[0] == value[0] and candidate_value[1] < value[1] - 1e-9):
+                        order = candidate
+                        value = candidate_value
+                        improved = True
+
+        # Obdržimo le del, ki ga utegnemo opraviti.
+        return order[:value[2]]
@@ -0,0 +1,106 @@
+# tu je implementiran razred "Trajectory"
+
+import math
+from time import time
+
+
+class Trajectory:
+    """
+    Časovno parametriziran profil hitrosti koles.
+
+    Profil je sestavljen iz zaporednih odsekov (rampa do ciljne hitrosti in
+    nato zadrževanje te hitrosti). Pospešek je omejen z accel_max, sprememba
+    pospeška (sunek) pa z jerk_max, zato je potek hitrosti gladek.
+    Glavna zanka profil le vzorči s trenutnim časom in nikoli ne čaka,
+    zato pospešek ni odvisen od hitrosti obhoda zanke.
+    """
+
+    def __init__(self, accel_max: float, jerk_max: float = None):
+        """
+        Argumenti:
+        accel_max: največji dovoljeni pospešek [°/s^2]
+        jerk_max: največji dovoljeni sunek [°/s^3], None pomeni brez omejitve
+        """
+        self._accel_max = accel_max
+        self._jerk_max = jerk_max
+        self._segments = []
+        self._t_end = None
+        self._v_end = 0
+
+    def start(self, v_start: float = 0, t: float = None):
+        """
+        Začni nov profil s hitrostjo v_start ob času t.
+        Vsi prej dodani odseki se zavržejo.
+        """
+        self._segments = []
+        self._t_end = time() if t is None else t
+        self._v_end = v_start
+
+    def ramp_to(self, v_target: float, hold: float = 0):
+        """
+        Dodaj odsek, ki hitrost spremeni do v_target in jo nato
+        zadrži še `hold` sekund.
+        """
+        delta = v_target - self._v_end
+        sign = 1 if delta >= 0 else -1
+        delta = abs(delta)
+        accel = self._accel_max
+        jerk = self._jerk_max
+
+        if jerk is None:
+            # Brez omejitve sunka: klasičen trapezni profil.
+            t_jerk = 0
+            t_accel = delta / accel
+            accel_peak = accel
+        elif delta >= accel * accel / jerk:
+            # Pospešek doseže accel_max in tam nekaj časa ostane.
+            t_jerk = accel / jerk
+            t_accel = delta / accel - t_jerk
+            accel_peak = accel
+        else:
+            # Sprememba hitrosti je premajhna, da bi dosegli accel_max.
+            t_jerk = math.sqrt(delta / jerk)
+            t_accel = 0
+            accel_peak = jerk * t_jerk
+
+        duration = 2 * t_jerk + t_accel
+        self._segments.append(
+            (self._t_end, self._v_end, v_target, sign,
+             t_jerk, t_accel, accel_peak, duration))
+        self._t_end += duration + hold
+        self._v_end = v_target
+
+    def sample(self, t: float = None) -> float:
+        """
+        Vrni nastavljeno hitrost ob času t.
+        """
+        if t is None:
+            t = time()
+        if not self._segments:
+            return self._v_end
+
+        for t_start, v_start, v_target, sign, t_jerk, t_accel, accel_peak, duration in self._segments:
+            dt = t - t_start
+            if dt < 0:
+                # Smo pred začetkom odseka (čakanje v prejšnjem odseku).
+                return v_start
+            if dt >= duration:
+                # Odsek je zaključen, preveri naslednjega.
+                continue
+            if dt < t_jerk:
+                return v_start + sign * self._jerk_max * dt * dt / 2
+            if dt < t_jerk + t_accel:
+                v_jerk = 0 if t_jerk == 0 else self._jerk_max * t_jerk * t_jerk / 2
+                return v_start + sign * (v_jerk + accel_peak * (dt - t_jerk))
+            # Zadnji del: pospešek se zmanjšuje proti 0.
+            tau = duration - dt
+            return v_target - sign * self._jerk_max * tau * tau / 2
+        return self._v_end
+
+    def done(self, t: float = None) -> bool:
+        """
+        Ali je profil (vključno z zadrževanjem) že zaključen?
+        """
+        if t is None:
+            t = time()
+        return self._t_end is None or t >= self._t_end
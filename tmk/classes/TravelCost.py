@@ -0,0 +1,91 @@
+# tu je implementirano iskanje cene vožnje do več ciljev hkrati (Dijkstra po legi in smeri)
+
+import heapq
+import math
+
+from .GridSearch import _prepare
+
+# Smeri v vrstnem redu naraščajočega kota (0°, 45°, ..., 315°), tako da
+# sta sosednji smeri oddaljeni za 45°.
+HEADINGS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+
+
+def heading_index(direction: float) -> int:
+    """
+    Najbližja od osmih smeri za kot direction [stopinje].
+    """
+    return int(round(direction / 45)) % 8
+
+
+def travel_costs(blocked, start, direction: float, targets, cell_size: float = 60,
+                 turn_cost: float = 60, reach: int = 2, weights=None):
+    """
+    Cena vožnje od celice start (robot gleda v smer direction) do vsakega
+    od ciljev z enim samim iskanjem. Stanje je (celica, ena od 8 smeri):
+    robot pelje eno celico naprej v svoji smeri ali se na mestu obrne za 45°
+    (cena turn_cost). Cene so v milimetrih vožnje.
+
+    Cilj (npr. jabolko) je dosežen, ko robot pride v prosto celico, od
+    ciljne oddaljeno največ reach celic, saj je celica samega jabolka
+    v razširjeni mreži zasedena.
+
+    Argumenti:
+    blocked: 2D tabela [x][y], True za zasedene celice
+    start: celica (x, y)
+    direction: smer robota [stopinje]
+    targets: seznam ciljnih celic (x, y)
+    cell_size: velikost celice [mm]
+    turn_cost: cena obrata za 45° [mm]
+    reach: kako blizu cilja mora robot priti [celice]
+    weights: 2D tabela množiteljev cene vstopa v celico ali None
+
+    Vrne (cene, število razširjenih stanj); cena je math.inf, če cilj ni dosegljiv.
+    """
+    free, stride = _prepare(blocked, start)
+    cost = None
+    if weights is not None:
+        cost = [1.0] * len(free)
+        for x, column in enumerate(weights):
+            base = (x + 1) * stride + 1
+            cost[base:base + len(column)] = list(column)
+    steps = [dx * stride + dy for dx, dy in HEADINGS]
+    lengths = [cell_size * (math.sqrt(2) if dx and dy else 1) for dx, dy in HEADINGS]
+
+    # Celica -> cilji, ki jih z nje dosežemo.
+    zones = {}
+    width = len(free) // stride - 2
+    height = stride - 2
+    for t, (tx, ty) in enumerate(targets):
+        for x in range(max(0, tx - reach), min(width, tx + reach + 1)):
+            for y in range(max(0, ty - reach), min(height, ty + reach + 1)):
+                zones.setdefault((x + 1) * stride + y + 1, []).append(t)
+
+    costs = [math.inf] * len(targets)
+    remaining = len(targets)
+    s = ((start[0] + 1) * stride + start[1] + 1) * 8 + heading_index(direction)
+    dist = [math.inf] * (len(free) * 8)
+    dist[s] = 0
+    heap = [(0, s)]
+    expanded = 0
+    while heap and remaining:
+        d, state = heapq.heappop(heap)
+        if d > dist[state]:
+            continue
+        expanded += 1
+        node = state >> 3
+        heading = state & 7
+        for t in zones.get(node, ()):
+            if costs[t] == math.inf:
+                costs[t] = d
+                remaining -= 1
+        candidates = [(state - heading + (heading + 1) % 8, turn_cost),
+                      (state - heading + (heading - 1) % 8, turn_cost)]
+        nb = node + steps[heading]
+        if free[nb] and (not heading & 1 or (free[node + steps[heading - 1]] and free[node + steps[(heading + 1) % 8]])):
+            candidates.append((nb * 8 + heading, lengths[heading] * (1 if cost is None else cost[nb])))
+        for other, step_cost in candidates:
+            nd = d + step_cost
+            if nd < dist[other]:
+                dist[other] = nd
+                heapq.heappush(heap, (nd, other))
+    return costs, expanded
@@ -0,0 +1,108 @@
+# tu je implementiran razred "UdpConnection"
+
+import select
+import socket
+import struct
+import ujson
+from time import time
+
+# Največja velikost datagrama UDP [B].
+UDP_BUFFER_SIZE = 65536
+
+
+class UdpConnection:
+    """
+    Sprejem stanja tekme v datagramih UDP (tudi multicast), ki jih pošilja
+    posrednik relay.py. Ima enak vmesnik kot Connection (buffer, receive,
+    request), zato ga lahko uporabimo namesto nje, tudi v ConnectionPolicy.
+
+    Vedno vzamemo najnovejši datagram, starejše v čakalni vrsti zavržemo.
+    Če datagrama ni, za nekaj časa preklopimo na rezervno povezavo (HTTP).
+    """
+
+    def __init__(
+            self,
+            port: int,
+            group: str = None,
+            timeout: float = 0.2,
+            fallback=None,
+            fallback_hold: float = 1.0):
+        """
+        Argumenti:
+        port: vrata, na katerih poslušamo
+        group: naslov skupine multicast; None za navaden (unicast) UDP
+        timeout: najdaljše čakanje na datagram [s]
+        fallback: rezervna povezava (npr. Connection) ali None
+        fallback_hold: koliko časa po izpadu uporabljamo rezervno povezavo [s]
+        """
+        self._timeout = timeout
+        self._fallback = fallback
+        self._fallback_hold = fallback_hold
+        self._fallback_until = 0
+        self._udp_buffer = bytearray(UDP_BUFFER_SIZE)
+        # Pomnilnik z zadnjim prejetim sporočilom (naš ali od rezervne povezave).
+        self.buffer = self._udp_buffer
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(('', port))
+        if group is not None:
+            membership = struct.pack('4s4s', socket.inet_aton(group), socket.inet_aton('0.0.0.0'))
+            self._socket.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        self._socket.setblocking(False)
+        # Števci za izpis po tekmi.
+        self.dropped = 0
+        self.fallbacks = 0
+
+    def _drain(self) -> int:
+        """
+        Preberi vse čakajoče datagrame; v pomnilniku ostane zadnji.
+        Vrne njegovo dolžino ali -1, če ni bilo nobenega.
+        """
+        length = -1
+        while True:
+            try:
+                received = self._socket.recv_into(self._udp_buffer)
+            except BlockingIOError:
+                return length
+            if length >= 0:
+                self.dropped += 1
+            length = received
+
+    def receive(self) -> int:
+        """
+        Sprejmi najnovejše stanje tekme v self.buffer. Vrne dolžino sporočila
+        oziroma -1, če ga ni bilo niti po rezervni povezavi.
+        """
+        if self._fallback is not None and time() < self._fallback_until:
+            return self._receive_fallback()
+        length = self._drain()
+        if length < 0 and select.select([self._socket], [], [], self._timeout)[0]:
+            length = self._drain()
+        if length >= 0:
+            self.buffer = self._udp_buffer
+            return length
+        if self._fallback is None:
+            return -1
+        self.fallbacks += 1
+        self._fallback_until = time() + self._fallback_hold
+        return self._receive_fallback()
+
+    def _receive_fallback(self) -> int:
+        length = self._fallback.receive()
+        self.buffer = self._fallback.buffer
+        return length
+
+    def request(self, debug=False):
+        """
+        Nalaganje podatkov o tekmi.
+        """
+        length = self.receive()
+        if length < 0:
+            return -1
+        msg = self.buffer[:length].decode()
+        try:
+            return ujson.loads(msg)
+        except ValueError as err:
+            if debug:
+                print('Napaka pri razclenjevanju datoteke JSON: ' + str(err))
+            return -1
@@ -0,0 +1,82 @@
+# tu je implementiran razred "Vec2"
+
+import math
+import numpy as np
+
+
+class Vec2:
+    """
+    Nespremenljiva točka (vektor) na poligonu.
+
+    Za razliko od razreda Point je ni mogoče spreminjati, zato je lahko
+    varno deljena med funkcijami in uporabljena kot ključ slovarja.
+    Uporablja __slots__, zato je ustvarjanje hitrejše in porabi manj pomnilnika.
+    """
+
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x: float, y: float):
+        # Polji nastavimo neposredno prek opisnikov __slots__ (hitreje kot
+        # object.__setattr__), ker __setattr__ prepoveduje spremembe.
+        _set_x(self, x)
+        _set_y(self, y)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Vec2 je nespremenljiv')
+
+    def __str__(self):
+        return '(' + str(self.x) + ', ' + str(self.y) + ')'
+
+    def __repr__(self):
+        return 'Vec2(' + str(self.x) + ', ' + str(self.y) + ')'
+
+    def __eq__(self, other):
+        return isinstance(other, Vec2) and self.x == other.x and self.y == other.y
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    def __add__(self, other):
+        return Vec2(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other):
+        return Vec2(self.x - other.x, self.y - other.y)
+
+    def __mul__(self, factor: float):
+        return Vec2(self.x * factor, self.y * factor)
+
+
+_set_x = Vec2.x.__set__
+_set_y = Vec2.y.__set__
+
+
+def transpose(point, direction: float, length: float) -> Vec2:
+    """
+    Vrni novo točko, ki je od `point` oddaljena za `length` v smeri
+    `direction` [stopinje]. Podane točke ne spremeni.
+    """
+    rad = math.radians(direction)
+    return Vec2(point.x + math.cos(rad) * length, point.y + math.sin(rad) * length)
+
+
+def distance(p1, p2) -> float:
+    """
+    Evklidska razdalja med točkama.
+    """
+    return math.hypot(p2.x - p1.x, p2.y - p1.y)
+
+
+def transpose_many(xs, ys, directions, length):
+    """
+    Različica funkcije transpose nad tabelami: vrne tabeli (xs, ys)
+    točk, premaknjenih za `length` v smereh `directions` [stopinje].
+    """
+    rad = np.radians(directions)
+    return np.asarray(xs) + np.cos(rad) * length, np.asarray(ys) + np.sin(rad) * length
+
+
+def distance_many(point, xs, ys):
+    """
+    Različica funkcije distance nad tabelami: razdalje od `point` do vseh točk (xs, ys).
+    """
+    return np.hypot(np.asarray(xs) - point.x, np.asarray(ys) - point.y)
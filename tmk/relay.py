@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+"""
+Posrednik, ki enkrat na sliko prebere game.json s strežnika in ga razdeli
+vsem odjemalcem: robotom v datagramih UDP (classes/UdpConnection.py) ter
+robotom, prikazom in zapisovalnikom prek lastnega strežnika HTTP.
+Tako kamero bremeni le en odjemalec.
+[Robo liga FRI 2019: Sadovnjak]
+@Copyright: TrijeMaliKlinci
+
+Uporaba (na računalniku v istem omrežju kot robot):
+    python3 relay.py --upstream http://192.168.0.153/game.json --udp 192.168.0.20:9000
+    python3 relay.py --upstream http://192.168.0.153/game.json --multicast 239.0.0.42:9000
+    python3 relay.py --upstream http://192.168.0.153/game.json --serve 8080
+
+Strežnik HTTP (--serve) ponuja:
+    /game.json                  zadnje stanje (keep-alive); glava X-Seq je zaporedna številka,
+                                X-Generation pa se spremeni ob vsakem zagonu posrednika
+    /game.json?after=N&wait=T   počaka do T sekund na stanje z X-Seq > N;
+                                če ga ni, vrne 304 (stanje se ni spremenilo)
+    /stream                     neprekinjen tok: za vsako stanje vrstica "<seq> <dolžina>\n",
+                                ki ji sledi telo v podani dolžini
+"""
+
+import argparse
+import random
+import socket
+import struct
+import threading
+from http.client import HTTPConnection, HTTPException
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from time import sleep, time
+from urllib.parse import urlsplit, parse_qs
+
+# Najdaljše čakanje pri dolgem povpraševanju (long-poll) [s].
+MAX_WAIT = 5.0
+
+
+class Upstream:
+    """
+    Branje game.json s strežnika prek ene ohranjene povezave HTTP (keep-alive).
+    """
+
+    def __init__(self, url: str, timeout: float = 1.0):
+        parts = urlsplit(url)
+        self._host = parts.netloc
+        self._path = parts.path or '/'
+        self._timeout = timeout
+        self._conn = None
+
+    def fetch(self):
+        """
+        Vrne telo odgovora (bytes) ali None ob napaki.
+        """
+        try:
+            if self._conn is None:
+                self._conn = HTTPConnection(self._host, timeout=self._timeout)
+            self._conn.request('GET', self._path)
+            response = self._conn.getresponse()
+            body = response.read()
+        except (OSError, HTTPException):
+            # Povezavo vzpostavimo na novo ob naslednjem poskusu.
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            return None
+        if response.status != 200:
+            return None
+        return body
+
+
+class FrameCache:
+    """
+    Zadnje stanje tekme z zaporedno številko, ki se poveča ob vsaki spremembi.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        # Oznaka zagona: zaporedne številke so primerljive le znotraj iste oznake.
+        self.generation = '%08x' % random.getrandbits(32)
+        self.seq = 0
+        self.body = b''
+
+    def publish(self, body: bytes) -> bool:
+        """
+        Shrani novo stanje. Vrne False, če je enako prejšnjemu.
+        """
+        with self._condition:
+            if body == self.body:
+                return False
+            self.body = body
+            self.seq += 1
+            self._condition.notify_all()
+            return True
+
+    def wait_newer(self, after: int, timeout: float):
+        """
+        Počakaj na stanje z zaporedno številko večjo od after.
+        Vrne (seq, body) ali None, če ga v času timeout ni.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.seq > after, timeout)
+            if self.seq > after:
+                return self.seq, self.body
+            return None
+
+
+class RelayServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, cache: FrameCache):
+        super().__init__(address, RelayHandler)
+        self.cache = cache
+
+
+class RelayHandler(BaseHTTPRequestHandler):
+    # Ohranjanje povezave (keep-alive) med zahtevki.
+    protocol_version = 'HTTP/1.1'
+    # Glavo in telo pošljemo brez čakanja (Nagle), sicer zakasnitev potrjevanja
+    # pri ohranjeni povezavi doda okoli 40 ms na zahtevek.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == '/stream':
+            self._stream()
+            return
+        query = parse_qs(parts.query)
+        after = int(query.get('after', ['0'])[0])
+        wait = min(float(query.get('wait', ['0'])[0]), MAX_WAIT)
+        frame = self.server.cache.wait_newer(after, wait if 'after' in query else 0)
+        if frame is None:
+            if 'after' not in query:
+                # Še nimamo nobenega stanja.
+                self._send(503, 0, b'')
+            else:
+                self._send(304, self.server.cache.seq, b'')
+            return
+        self._send(200, frame[0], frame[1])
+
+    def _send(self, code: int, seq: int, body: bytes):
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('X-Seq', str(seq))
+        self.send_header('X-Generation', self.server.cache.generation)
+        if code != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        seq = 0
+        try:
+            while True:
+                frame = self.server.cache.wait_newer(seq, MAX_WAIT)
+                if frame is None:
+                    continue
+                seq, body = frame
+                self.wfile.write(('%d %d\n' % (seq, len(body))).encode() + body)
+                self.wfile.flush()
+        except OSError:
+            # Odjemalec je prekinil povezavo.
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_address(address: str):
+    host, port = address.rsplit(':', 1)
+    return host, int(port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Posrednik game.json -> UDP in HTTP')
+    parser.add_argument('--upstream', required=True, help='URL do game.json')
+    parser.add_argument('--interval', type=float, default=0.02, help='razmik med branji [s]')
+    parser.add_argument('--udp', action='append', default=[], help='naslov:vrata robota (lahko večkrat)')
+    parser.add_argument('--multicast', help='skupina:vrata multicast')
+    parser.add_argument('--ttl', type=int, default=1, help='TTL za multicast')
+    parser.add_argument('--serve', type=int, help='vrata lastnega strežnika HTTP')
+    options = parser.parse_args()
+
+    targets = [parse_address(address) for address in options.udp]
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if options.multicast:
+        targets.append(parse_address(options.multicast))
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, struct.pack('b', options.ttl))
+    if not targets and options.serve is None:
+        parser.error('podaj vsaj en --udp, --multicast ali --serve')
+
+    cache = FrameCache()
+    if options.serve is not None:
+        server = RelayServer(('', options.serve), cache)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    upstream = Upstream(options.upstream)
+    sent = 0
+    errors = 0
+    t_report = time()
+    try:
+        while True:
+            t_start = time()
+            body = upstream.fetch()
+            if body is None:
+                errors += 1
+            elif cache.publish(body):
+                # Vsako novo stanje pošljemo le enkrat.
+                for target in targets:
+                    sock.sendto(body, target)
+                sent += 1
+            if time() - t_report > 5:
+                print('Poslanih stanj: %d, napak: %d' % (sent, errors))
+                t_report = time()
+            sleep(max(0, options.interval - (time() - t_start)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+"""
+Posnetek načrtovanja poti iz zaporedja stanj tekme, brez zaslona in robota.
+[Robo liga FRI 2019: Sadovnjak]
+@Copyright: TrijeMaliKlinci
+
+Za vsako stanje posodobimo CostMap, poiščemo pot od našega robota do
+najbližjega dobrega jabolka in sliko (GridImage.render) dodamo v FrameStream.
+Brez ffmpeg dobimo mapo oštevilčenih slik PNG.
+
+Uporaba:
+    python3 replay.py tekma.mp4                         # sintetična tekma
+    python3 replay.py tekma.mp4 game0.json game1.json   # posneta sporočila
+Sporočila posnamemo z bench_decode.py --record.
+"""
+
+import math
+import sys
+
+import ujson
+
+from classes.CostMap import CostMap
+from classes.FrameStream import FrameStream
+from classes.GridImage import render
+from classes.GridSearch import astar
+from stand_in_server import synthetic_state
+
+# ID našega robota (enak kot v Refractored.py).
+ROBOT_ID = 35
+# Trajanje in hitrost sintetične tekme.
+SYNTHETIC_TIME = 10
+FPS = 10
+
+
+def nearest_good_apple(state: dict, robot: dict):
+    best = None
+    best_dist = math.inf
+    for apple in state['apples']:
+        if apple['type'] != 'appleGood':
+            continue
+        dist = math.hypot(apple['position'][0] - robot['position'][0],
+                          apple['position'][1] - robot['position'][1])
+        if dist < best_dist:
+            best_dist = dist
+            best = apple
+    return best
+
+
+def frame(cost_map: CostMap, state: dict):
+    """
+    Slika načrtovanja poti za eno stanje tekme.
+    """
+    grid = cost_map.grid
+    robot = next((robot for robot in state['robots'] if robot['id'] == ROBOT_ID), None)
+    target = nearest_good_apple(state, robot) if robot is not None else None
+    ignore = [('apple', target['id'])] if target is not None else []
+    cost_map.update(state, ROBOT_ID, ignore)
+
+    path = None
+    if target is not None:
+        path, _ = astar(cost_map.blocked(), grid.cell(*robot['position']),
+                        grid.cell(*target['position']), cost_map.weights())
+    apples = [(grid.cell(*apple['position']), apple['type']) for apple in state['apples']]
+    robots = [(grid.cell(*robot['position']), robot['id'] == ROBOT_ID) for robot in state['robots']]
+    return render(cost_map.blocked(), cost_map.weights(), path=path, apples=apples, robots=robots)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+
+    if len(sys.argv) > 2:
+        states = []
+        for name in sys.argv[2:]:
+            with open(name, 'rb') as f:
+                states.append(ujson.loads(f.read()))
+    else:
+        states = [synthetic_state(i / FPS) for i in range(SYNTHETIC_TIME * FPS)]
+
+    cost_map = CostMap.from_field(states[0]['field'])
+    with FrameStream(sys.argv[1], FPS) as stream:
+        for state in states:
+            stream.write(frame(cost_map, state))
+    print('Zapisanih slik: %d' % stream.frames)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+"""
+Nadomestni strežnik za game.json, s katerim preizkusimo povezavo brez kamere.
+[Robo liga FRI 2019: Sadovnjak]
+@Copyright: TrijeMaliKlinci
+
+Strežnik pošilja sintetično stanje tekme (robota se vozita v krogu, čas teče)
+in po želji vnaša napake: zakasnitve, pokvarjena sporočila in napake HTTP.
+
+Uporaba (na računalniku):
+    python3 stand_in_server.py --port 8000 --delay 0.5 --delay-prob 0.1 --malformed-prob 0.05
+Na robotu nastavimo SERVER_IP = "<ip računalnika>:8000".
+"""
+
+import argparse
+import math
+import random
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from time import sleep, time
+
+import ujson
+
+# Trajanje tekme [s].
+MATCH_TIME = 100
+
+
+def synthetic_state(t: float = 0, num_apples: int = 20, seed: int = 0) -> dict:
+    """
+    Stanje tekme z enako zgradbo, kot jo pošilja strežnik, t sekund po začetku.
+    """
+    rnd = random.Random(seed)
+
+    def rect(x, y, w, h):
+        return {'topLeft': [x, y + h], 'topRight': [x + w, y + h],
+                'bottomLeft': [x, y], 'bottomRight': [x + w, y]}
+
+    field = rect(0, 0, 3500, 2000)
+    field['baskets'] = {'team1': rect(0, 750, 500, 500), 'team2': rect(3000, 750, 500, 500)}
+    robots = []
+    for i, robot_id in enumerate((35, 12)):
+        # Robota krožita okoli svojih točk s hitrostjo 20 °/s.
+        angle = 20 * t + 180 * i
+        cx = 1000 + 1500 * i
+        robots.append({'id': robot_id,
+                       'position': [cx + 400 * math.cos(math.radians(angle)),
+                                    1000 + 400 * math.sin(math.radians(angle))],
+                       'direction': (angle + 90 + 180) % 360 - 180})
+    return {
+        'gameOn': t < MATCH_TIME,
+        'timeLeft': max(0, round(MATCH_TIME - t, 1)),
+        'field': field,
+        'team1': {'id': 35, 'name': 'TrijeMaliKlinci', 'score': 0},
+        'team2': {'id': 12, 'name': 'Nasprotnik', 'score': 0},
+        'robots': robots,
+        'apples': [{'id': i, 'position': [rnd.uniform(600, 2900), rnd.uniform(100, 1900)],
+                    'direction': 0, 'type': rnd.choice(['appleGood', 'appleBad'])}
+                   for i in range(num_apples)],
+    }
+
+
+def synthetic_payload(t: float = 0, num_apples: int = 20) -> bytes:
+    """
+    Sporočilo strežnika (JSON) s stanjem tekme ob času t.
+    """
+    return ujson.dumps(synthetic_state(t, num_apples)).encode()
+
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, options):
+        super().__init__(address, StandInHandler)
+        self.options = options
+        self.start_time = time()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # Omogoča ohranjanje povezave (keep-alive), kot ga uporablja pycurl.
+    protocol_version = 'HTTP/1.1'
+    # Glavo in telo pošljemo brez čakanja (Nagle), sicer zakasnitev potrjevanja
+    # pri ohranjeni povezavi doda okoli 40 ms na zahtevek.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        options = self.server.options
+        if random.random() < options.delay_prob:
+            sleep(options.delay)
+        if random.random() < options.error_prob:
+            self._send(500, b'Napaka')
+            return
+        body = synthetic_payload(time() - self.server.start_time, options.apples)
+        if random.random() < options.malformed_prob:
+            # Odrežemo konec sporočila, kot bi se zgodilo pri prekinjeni povezavi.
+            body = body[:random.randint(0, len(body) - 1)]
+        self._send(200, body)
+
+    def _send(self, code: int, body: bytes):
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Nadomestni strežnik za game.json')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--apples', type=int, default=20, help='število jabolk')
+    parser.add_argument('--delay', type=float, default=0.5, help='dolžina zakasnitve [s]')
+    parser.add_argument('--delay-prob', type=float, default=0, help='verjetnost zakasnitve')
+    parser.add_argument('--malformed-prob', type=float, default=0, help='verjetnost pokvarjenega sporočila')
+    parser.add_argument('--error-prob', type=float, default=0, help='verjetnost napake HTTP 500')
+    options = parser.parse_args()
+
+    server = StandInServer(('', options.port), options)
+    print('Strežnik posluša na vratih %d' % options.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()